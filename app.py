@@ -1,10 +1,12 @@
 import os
 import logging
 import re
+from datetime import datetime, timedelta, timezone
 from functools import wraps
+from operator import itemgetter
 
 from flask import (
-    Flask, render_template, request, redirect, url_for, session, flash, g
+    Flask, render_template, stream_template, request, redirect, url_for, session, flash, g
 )
 
 from utils.db import get_db_connection, init_db
@@ -27,6 +29,20 @@ from ai_insights import (
 # Logging Setup
 logging.basicConfig(level=logging.INFO)
 
+# Trip fields in calculate_driving_score() argument order, followed by the
+# remaining fields trip_detail() requires to be present.
+SCORE_FIELDS = (
+    "avg_speed_kmph", "max_rpm", "brake_events", "steering_angle",
+    "angular_velocity", "acceleration", "gear_position", "tire_pressure",
+    "engine_load", "throttle_position", "brake_pressure", "trip_duration"
+)
+TRIP_FIELDS = SCORE_FIELDS + ("max_speed", "fuel_consumed")
+get_trip_vals = itemgetter(*TRIP_FIELDS)
+TRIP_DETAIL_QUERY = (
+    "SELECT id, user_id, trip_date, distance_km, start_location, end_location, "
+    + ", ".join(TRIP_FIELDS) + " FROM trips WHERE id = ?"
+)
+
 # --- ML pipeline loader ---
 try:
     from ml_model.model_utils import load_artifacts, predict_behavior
@@ -61,7 +77,7 @@ def login_required(f):
 # --- Filters ---
 @app.template_filter('to_dict')
 def to_dict(row):
-    return {key: value for key, value in row.items()}
+    return dict(row)
 
 
 # --- Routes ---
@@ -186,63 +202,49 @@ def dashboard():
         SELECT id, trip_date, distance_km, avg_speed_kmph, max_rpm, max_speed, fuel_consumed, brake_events, steering_angle, angular_velocity,
         acceleration, gear_position, tire_pressure, engine_load, throttle_position, brake_pressure, trip_duration, start_location, end_location 
         FROM trips
-        WHERE user_id = ? 
+        WHERE user_id = ? AND distance_km > 0 AND avg_speed_kmph > 0 AND max_rpm IS NOT NULL
         ORDER BY trip_date DESC
         LIMIT 15
     ''', (session['user_id'],))
-    rows = cur.fetchall()
-    trips = [dict(zip([column[0] for column in cur.description], row)) for row in rows]
+    trips = cur.fetchall()
 
+    # Alert timestamps are stored as UTC CURRENT_TIMESTAMP values
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=30)).strftime('%Y-%m-%d')
     alert_count = cur.execute(
-        "SELECT COUNT(*) FROM alerts WHERE user_id = ? AND resolved = FALSE AND timestamp >= date('now','-30 days')",
-        (session['user_id'],)
+        "SELECT COUNT(*) FROM alerts WHERE user_id = ? AND resolved = 0 AND timestamp >= ?",
+        (session['user_id'], cutoff)
     ).fetchone()[0]
     conn.close()
 
-    valid_trips = [
-        trip for trip in trips
-        if trip.get('distance_km', 0) > 0 and trip.get('avg_speed_kmph', 0) > 0 and trip.get('max_rpm') is not None
-    ]
-    return render_template('dashboard.html', trips=valid_trips, alert_count=alert_count)
+    # Stream the page so the header reaches the client while the trip table renders
+    return stream_template('dashboard.html', trips=trips, alert_count=alert_count)
 
 
 @app.route("/trip/<int:trip_id>")
 @login_required
 def trip_detail(trip_id):
     conn = get_db_connection()
-    trip_row = conn.execute("SELECT * FROM trips WHERE id = ?", (trip_id,)).fetchone()
+    trip = conn.execute(TRIP_DETAIL_QUERY, (trip_id,)).fetchone()
     conn.close()
 
-    if not trip_row:
+    if not trip:
         return "Trip not found", 404
 
     try:
-        trip_dict = dict(trip_row)
-
         # Required trip fields
-        field_names = [
-            "avg_speed_kmph", "max_speed", "max_rpm", "fuel_consumed", "brake_events",
-            "steering_angle", "angular_velocity", "acceleration", "gear_position",
-            "tire_pressure", "engine_load", "throttle_position", "brake_pressure",
-            "trip_duration"
-        ]
-        required_values = [trip_dict.get(f) for f in field_names]
-        if None in required_values:
-            missing_fields = [f for f, v in zip(field_names, required_values) if v is None]
+        trip_vals = get_trip_vals(trip)
+        if any(v is None for v in trip_vals):
+            missing_fields = [f for f, v in zip(TRIP_FIELDS, trip_vals) if v is None]
             raise ValueError(f"Missing trip data: {', '.join(missing_fields)}")
 
         # Logic-based scoring
-        logic_behavior, logic_score = calculate_driving_score(
-            trip_dict["avg_speed_kmph"], trip_dict["max_rpm"], trip_dict["brake_events"], trip_dict["steering_angle"],
-            trip_dict["angular_velocity"], trip_dict["acceleration"], trip_dict["gear_position"], trip_dict["tire_pressure"],
-            trip_dict["engine_load"], trip_dict["throttle_position"], trip_dict["brake_pressure"], trip_dict["trip_duration"]
-        )
+        logic_behavior, logic_score = calculate_driving_score(*trip_vals[:len(SCORE_FIELDS)])
 
         # ML prediction (if available)
         ml_behavior, ml_confidence, ml_model_used, ml_error = "Unknown", 0.0, "None", None
         if ML_MODEL_LOADED:
             try:
-                ml_result = predict_behavior(trip_dict, model, scaler, le, model_info)
+                ml_result = predict_behavior(trip, model, scaler, le, model_info)
                 ml_behavior = ml_result.get('behavior_class', 'Unknown')
                 ml_confidence = ml_result.get('confidence', 0.0)
                 ml_model_used = ml_result.get('model_used', 'Unknown')
@@ -255,7 +257,7 @@ def trip_detail(trip_id):
             ml_error = "ML pipeline not loaded"
 
         # Maintenance alerts and health recommendation
-        maintenance_alerts, health_recommendation = build_alerts(trip_dict)
+        maintenance_alerts, health_recommendation = build_alerts(trip)
         # Save alerts to DB if any
         if maintenance_alerts:
             try:
@@ -286,7 +288,7 @@ def trip_detail(trip_id):
 
     return render_template(
         "trip_detail.html",
-        trip=trip_dict,
+        trip=trip,
         logic_score=logic_score,
         logic_behavior=logic_behavior,
         ml_behavior=ml_behavior,
@@ -295,17 +297,17 @@ def trip_detail(trip_id):
         ml_error=ml_error,
         health_recommendation=combined_recommendation,
         maintenance_alerts=maintenance_alerts,
-        fuel_consumed=trip_dict.get("fuel_consumed"),
-        brake_events=trip_dict.get("brake_events"),
-        steering_angle=trip_dict.get("steering_angle"),
-        acceleration=trip_dict.get("acceleration"),
-        angular_velocity=trip_dict.get("angular_velocity"),
-        gear_position=trip_dict.get("gear_position"),
-        throttle_position=trip_dict.get("throttle_position"),
-        brake_pressure=trip_dict.get("brake_pressure"),
-        tire_pressure=trip_dict.get("tire_pressure"),
-        engine_load=trip_dict.get("engine_load"),
-        trip_duration=trip_dict.get("trip_duration")
+        fuel_consumed=trip.get("fuel_consumed"),
+        brake_events=trip.get("brake_events"),
+        steering_angle=trip.get("steering_angle"),
+        acceleration=trip.get("acceleration"),
+        angular_velocity=trip.get("angular_velocity"),
+        gear_position=trip.get("gear_position"),
+        throttle_position=trip.get("throttle_position"),
+        brake_pressure=trip.get("brake_pressure"),
+        tire_pressure=trip.get("tire_pressure"),
+        engine_load=trip.get("engine_load"),
+        trip_duration=trip.get("trip_duration")
     )
 
 
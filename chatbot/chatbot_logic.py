@@ -1,7 +1,13 @@
 import re
-import random
-from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+import time
+import threading
+from bisect import bisect_left
+from collections import deque, namedtuple
+import numpy as np
+from functools import lru_cache
+from itertools import cycle
+from operator import itemgetter
+from typing import Dict, List, Any, Optional, Tuple
 try:
     from .nlp_engine import NLPEngine
     NLP_AVAILABLE = True
@@ -9,100 +15,398 @@ except ImportError:
     NLP_AVAILABLE = False
     NLPEngine = None
 
+# Messages kept per session (user and bot entries both count)
+HISTORY_MAXLEN = 64
+
+# Trip columns the advice handlers aggregate over
+TRIP_STAT_FIELDS = ('avg_speed_kmph', 'distance_km', 'fuel_consumed', 'max_rpm', 'brake_events')
+_get_trip_stat_fields = itemgetter(*TRIP_STAT_FIELDS)
+
+TripStats = namedtuple('TripStats', [
+    'count', 'total_distance', 'total_fuel', 'total_brake_events',
+    'avg_speed', 'avg_fuel', 'avg_rpm', 'avg_brake_events'
+])
+
+_RESPONSES = {
+    'greeting': (
+        "Hello! I'm your vehicle assistant. How can I help you today?",
+        "Hi there! I can help you with driving tips and vehicle data analysis.",
+        "Welcome! Ask me about your driving performance or vehicle maintenance.",
+        "Good day! Ready to optimize your driving experience?",
+        "Hey! I'm here to help with all your vehicle questions."
+    ),
+    'driving_tips': (
+        "🚗 Eco-driving tips:\n• Maintain steady speeds (50-80 km/h is optimal)\n• Avoid rapid acceleration and hard braking\n• Keep tires properly inflated\n• Remove excess weight from your vehicle",
+        "🛣️ Highway driving tips:\n• Use cruise control when possible\n• Maintain 3-second following distance\n• Plan lane changes early\n• Keep windows closed at high speeds",
+        "🏙️ City driving tips:\n• Anticipate traffic lights\n• Coast to red lights instead of braking hard\n• Use gentle acceleration from stops\n• Avoid rush hour when possible"
+    ),
+    'fuel_efficiency': (
+        "⛽ Fuel efficiency strategies:\n• Drive at steady speeds between 50-80 km/h\n• Avoid excessive idling (turn off engine if waiting >30 seconds)\n• Maintain proper tire pressure\n• Use air conditioning wisely",
+        "💡 Advanced fuel tips:\n• Combine multiple errands into one trip\n• Remove roof racks when not in use\n• Keep up with regular maintenance\n• Use the recommended grade of motor oil",
+        "📊 Your fuel consumption can improve by 10-15% with:\n• Smooth acceleration and braking\n• Proper vehicle maintenance\n• Route planning to avoid traffic\n• Maintaining optimal tire pressure"
+    ),
+    'maintenance': (
+        "🔧 Essential maintenance schedule:\n• Oil change: Every 5,000-7,500 miles\n• Tire rotation: Every 6,000-8,000 miles\n• Brake inspection: Every 12,000 miles\n• Air filter: Every 12,000-15,000 miles",
+        "📅 Monthly checks:\n• Tire pressure and tread depth\n• Fluid levels (oil, coolant, brake)\n• Lights and signals\n• Battery terminals\n• Windshield wipers",
+        "⚠️ Warning signs to watch for:\n• Dashboard warning lights\n• Unusual noises or vibrations\n• Changes in steering or braking\n• Fluid leaks under the vehicle\n• Decreased fuel efficiency"
+    ),
+    'safety': (
+        "🛡️ Safety reminders:\n• Always wear your seatbelt\n• Adjust mirrors before driving\n• Keep a safe following distance\n• Avoid phone use while driving\n• Check blind spots before changing lanes",
+        "🌧️ Weather driving tips:\n• Reduce speed in rain/snow\n• Increase following distance\n• Use headlights in poor visibility\n• Avoid sudden movements\n• Keep emergency kit in car"
+    ),
+    'default': (
+        "I can help you with:\n🚗 Driving tips and techniques\n⛽ Fuel efficiency advice\n🔧 Maintenance schedules\n📊 Trip data analysis\n🛡️ Safety reminders\n\nWhat interests you most?",
+        "Ask me about:\n• Your driving performance\n• Fuel-saving techniques\n• Vehicle maintenance\n• Safety tips\n• Trip analysis\n• Weather driving conditions",
+        "I'm your vehicle expert! Try asking:\n• 'How can I save fuel?'\n• 'Analyze my trips'\n• 'Give me safety tips'\n• 'What maintenance do I need?'"
+    ),
+    'gratitude': (
+        "You're welcome! Drive safely! 🚗",
+        "Happy to help! Stay safe on the roads! 🛣️",
+        "Anytime! Feel free to ask more questions. 🤖",
+        "Glad I could assist! Keep up the good driving! 👍",
+        "My pleasure! Remember, safe driving saves lives and money! 💰"
+    )
+}
+
+_PATTERNS = {
+    'greeting': [r'\b(hi|hello|hey|good morning|good afternoon|good evening|greetings)\b'],
+    'driving_tips': [r'\b(driving tips|drive better|improve driving|safe driving|how to drive|driving advice)\b'],
+    'fuel_efficiency': [r'\b(fuel|efficiency|mpg|gas|consumption|save fuel|mileage|economy|eco.?driving)\b'],
+    'maintenance': [r'\b(maintenance|service|oil change|tire|brake|check|repair|schedule|servicing)\b'],
+    'trip_data': [r'\b(trip|data|distance|speed|rpm|analysis|analyze|performance|stats|metrics)\b'],
+    'safety': [r'\b(safety|safe|accident|crash|seatbelt|emergency|hazard)\b'],
+    'weather': [r'\b(weather|rain|snow|fog|storm|winter|summer|conditions)\b'],
+    'route': [r'\b(route|navigation|directions|path|way|road)\b'],
+    'cost': [r'\b(cost|money|expensive|cheap|budget|price|save)\b']
+}
+
+# Category patterns are compiled once at import; re.IGNORECASE is baked in
+_CATEGORY_PATTERNS = {
+    category: [re.compile(pattern, re.IGNORECASE) for pattern in category_patterns]
+    for category, category_patterns in _PATTERNS.items()
+}
+# All categories fused into one alternation with a named group each, so a
+# single scan of the message reports every category it touches. The
+# lookahead keeps matches from consuming text: otherwise 'eco driving'
+# (fuel_efficiency) would swallow the start of 'driving tips' and hide
+# the higher-priority driving_tips match that overlaps it
+_CATEGORY_RE = re.compile(
+    '(?=' + '|'.join(f'(?P<{category}>{"|".join(category_patterns)})'
+                     for category, category_patterns in _PATTERNS.items()) + ')',
+    re.IGNORECASE
+)
+_CATEGORY_RANK = {category: rank for rank, category in enumerate(_PATTERNS)}
+
+# Keyword groups in priority order. No word boundaries, so matching is
+# the same substring test as before ('alerts' still hits 'alert')
+_KEYWORDS = {
+    'performance': r'score|performance|rating',
+    'alert': r'alert|warning|problem',
+    'thanks': r'thank|thanks',
+    'help': r'help|what can you do',
+    'rpm': r'rpm|revolutions',
+    'acceleration': r'acceleration|accelerate',
+    'vehicle': r'vehicle|car|my car',
+    'compare': r'compare|comparison|vs',
+    'summary': r'week|weekly|summary',
+    'streak': r'streak|consistent|progress'
+}
+# Fused like the category regex. The lookahead keeps matches from
+# consuming text, so overlapping keywords are all seen in one scan
+_KEYWORD_RE = re.compile(
+    '(?=' + '|'.join(f'(?P<{key}>{alternatives})' for key, alternatives in _KEYWORDS.items()) + ')',
+    re.IGNORECASE | re.DOTALL
+)
+_KEYWORD_RANK = {key: rank for rank, key in enumerate(_KEYWORDS)}
+# Lowest priority: the words 'how' and 'improve' or 'better', checked on
+# whole words so 'however' or 'betterment' do not count
+_IMPROVEMENT_WORDS = frozenset(('improve', 'better'))
+# Keyword group -> name of the VehicleChatbot method that answers it; every
+# handler takes user_data. Names rather than bound methods keep the table
+# shared and free of per-instance closures
+_KEYWORD_HANDLERS = {
+    'performance': '_performance_advice',
+    'alert': '_alert_advice',
+    'thanks': '_gratitude_response',
+    'help': '_show_capabilities',
+    'rpm': '_rpm_advice',
+    'acceleration': '_acceleration_advice',
+    'vehicle': '_vehicle_info',
+    'compare': '_comparison_analysis',
+    'summary': '_weekly_summary',
+    'streak': '_streak_analysis',
+    'improvement': '_improvement_suggestions'
+}
+# Bare greetings, thanks and help requests have fixed answers, so they are
+# answered before the NLP analysis. Word -> 'greeting' or a keyword group
+_FASTPATH_RE = re.compile(r'^(hi|hello|hey|thanks?|thank you|help)\b[\s!.?]*$', re.IGNORECASE)
+_FASTPATH_KINDS = {
+    'hi': 'greeting', 'hello': 'greeting', 'hey': 'greeting',
+    'thank': 'thanks', 'thanks': 'thanks', 'thank you': 'thanks',
+    'help': 'help'
+}
+
+_INTENT_KEYWORDS = {
+    'question': ['what', 'how', 'why', 'when', 'where', 'which', 'who'],
+    'request': ['can you', 'could you', 'please', 'help me', 'show me'],
+    'comparison': ['vs', 'versus', 'compare', 'better', 'worse', 'difference'],
+    'improvement': ['improve', 'better', 'optimize', 'enhance', 'increase']
+}
+# Intent cues as whole words: single-word cues are looked up in the
+# message's token set, the few multi-word cues ('can you', ...) by regex
+_WORD_RE = re.compile(r"[a-z']+")
+_INTENT_WORDS = {
+    intent: frozenset(keyword for keyword in keywords if ' ' not in keyword)
+    for intent, keywords in _INTENT_KEYWORDS.items()
+}
+_INTENT_PHRASES = {
+    intent: re.compile(r'\b(?:' + '|'.join(phrases) + r')\b', re.IGNORECASE)
+    for intent, phrases in (
+        (intent, [keyword for keyword in keywords if ' ' in keyword])
+        for intent, keywords in _INTENT_KEYWORDS.items()
+    )
+    if phrases
+}
+
+# Messages are only stripped, not lower-cased, so every substring check
+# below is a case-insensitive regex
+_FOLLOW_UP_RE = re.compile(r'more|tell me|explain', re.IGNORECASE)
+_CLARIFY_RE = re.compile(r'what do you mean|explain|clarify', re.IGNORECASE)
+_FUEL_RE = re.compile(r'fuel', re.IGNORECASE)
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+# Greeting for each hour of the day, indexed by the local hour
+_GREETINGS = tuple(
+    "Good morning!" if hour < 12 else "Good afternoon!" if hour < 17 else "Good evening!"
+    for hour in range(24)
+)
+
+# Fixed lines of the trip analysis, shared by every reply
+_RECOMMENDATIONS_HEADER = "💡 Recommendations:"
+_TIP_REDUCE_SPEED = "• Consider reducing speed to 70-80 km/h for 15% better fuel efficiency"
+_TIP_CITY_SPEED = "• Your city driving speeds are excellent for fuel economy"
+_TIP_LOWER_RPM = "• Try to keep RPM under 3000 for better engine efficiency"
+_TIP_SMOOTHER_BRAKING = "• Work on smoother driving to reduce brake events"
+_TIP_SMOOTH_BRAKING = "• Great job on smooth driving with minimal braking!"
+
+# Driving score thresholds: a point is lost for each one the trip average is above
+_SPEED_PENALTY_THRESHOLDS = (80, 90)
+_RPM_PENALTY_THRESHOLDS = (3000, 4000)
+_BRAKE_PENALTY_THRESHOLDS = (10, 15)
+
+# Fixed advice replies, built once at import rather than per call
+_WEATHER_ADVICE = "🌦️ Weather Driving Tips:\n\n🌧️ **Rain:**\n• Reduce speed by 10-15%\n• Increase following distance to 4+ seconds\n• Use headlights even during day\n• Avoid sudden movements\n\n❄️ **Snow/Ice:**\n• Drive 50% slower than normal\n• Brake gently and early\n• Accelerate slowly\n• Keep emergency kit in car\n\n🌫️ **Fog:**\n• Use low beam headlights\n• Follow road markings\n• Increase following distance\n• Pull over if visibility is too poor"
+_ROUTE_ADVICE = "🗺️ Smart Route Planning:\n\n📱 **Before You Go:**\n• Check traffic conditions\n• Plan fuel stops for long trips\n• Consider alternate routes\n• Update GPS maps regularly\n\n⛽ **Fuel Efficiency Routes:**\n• Avoid heavy traffic areas\n• Choose highways over city streets\n• Plan errands in one trip\n• Use route optimization apps\n\n🚗 **Safety First:**\n• Share your route with someone\n• Check weather conditions\n• Ensure vehicle is road-ready"
+_DETAILED_FUEL_TIPS = "🔍 **Detailed Fuel Efficiency Guide:**\n\n🏎️ **Speed & Efficiency:**\n• 50-80 km/h: Optimal efficiency zone\n• Every 10 km/h over 80: ~10% more fuel\n• Highway vs city: 15-20% difference\n\n🚗 **Driving Techniques:**\n• Gradual acceleration (0-60 in 15+ seconds)\n• Anticipate stops (coast vs brake)\n• Maintain steady speeds\n• Use cruise control on highways\n\n🔧 **Vehicle Factors:**\n• Tire pressure: 3% efficiency per 1 PSI low\n• Weight: 2% per 100 lbs excess\n• Aerodynamics: Windows vs A/C at speed\n• Engine maintenance: 4% with proper tune-up"
+_ALERT_ADVICE = "⚠️ **Vehicle Alert Guide:**\n\n🚨 **Immediate Action Required:**\n• Engine temperature warning\n• Oil pressure light\n• Brake system warning\n• Battery/charging system\n\n⚡ **Soon (within days):**\n• Low tire pressure\n• Fuel level low\n• Maintenance due\n• Check engine light\n\n📅 **Preventive Monitoring:**\n• Dashboard warning lights\n• Unusual noises or vibrations\n• Changes in performance\n• Fluid leaks\n\n💡 **Pro Tip:** Address warnings early to prevent costly repairs!"
+_ACCELERATION_ADVICE = "🚀 **Smart Acceleration Guide:**\n\n⚡ **Fuel-Efficient Acceleration:**\n• 0-60 km/h in 15+ seconds\n• Keep RPM under 3000\n• Use 75% throttle maximum\n• Shift at 2500 RPM (manual)\n\n🏁 **Performance vs Economy:**\n• Aggressive: 0-60 in <10 sec (40% more fuel)\n• Normal: 0-60 in 10-15 sec (balanced)\n• Eco: 0-60 in 15+ sec (optimal efficiency)\n\n🎯 **Technique Tips:**\n• Smooth, progressive pressure\n• Anticipate traffic flow\n• Use eco-mode when available\n• Coast to decelerate when possible"
+_CAPABILITIES = "🤖 I can help you with:\n\n🚗 Driving Tips & Techniques\n⛽ Fuel Efficiency Strategies\n🔧 Maintenance Schedules\n📊 Trip Data Analysis\n🛡️ Safety Reminders\n💰 Cost-Saving Tips\n\nJust ask me anything about your vehicle!"
+_COST_SAVING_TIPS = "💰 Cost-Saving Driving Tips:\n\n⛽ **Fuel Costs:**\n• Maintain steady speeds (50-80 km/h)\n• Remove excess weight\n• Keep tires properly inflated\n• Combine multiple errands\n\n🔧 **Maintenance Costs:**\n• Follow service schedules\n• Check fluids regularly\n• Address issues early\n• Learn basic maintenance\n\n🚗 **Smart Driving:**\n• Avoid rush hour when possible\n• Use cruise control on highways\n• Plan efficient routes"
+_IMPROVEMENT_SUGGESTIONS = (
+    "🚀 Ways to improve your driving:\n\n"
+    "1️⃣ **Fuel Efficiency:**\n   • Maintain 50-80 km/h when possible\n   • Avoid rapid acceleration\n   • Plan routes to minimize stops\n\n"
+    "2️⃣ **Safety:**\n   • Increase following distance\n   • Check mirrors every 5-8 seconds\n   • Anticipate other drivers' actions\n\n"
+    "3️⃣ **Vehicle Care:**\n   • Regular maintenance checks\n   • Monitor tire pressure monthly\n   • Keep emergency kit in car\n\n"
+)
+
+def _trip_rows(trips) -> Tuple[tuple, ...]:
+    """TRIP_STAT_FIELDS values of each trip as a hashable tuple of tuples"""
+    # Rows from the app carry every field, so a C-level itemgetter does the
+    # extraction; hand-built trips missing a field fall back to .get()
+    try:
+        return tuple(map(_get_trip_stat_fields, trips))
+    except KeyError:
+        return tuple(tuple(trip.get(field, 0) for field in TRIP_STAT_FIELDS) for trip in trips)
+
+def _to_soa(trips):
+    """Convert a list of trip dicts to (table, columns) over TRIP_STAT_FIELDS.
+
+    table is a (len(trips) x fields) float64 array; columns maps each field
+    to its column view, so callers can work on contiguous per-field data.
+    """
+    table = np.array(_trip_rows(trips), dtype=np.float64).reshape(len(trips), len(TRIP_STAT_FIELDS))
+    return table, dict(zip(TRIP_STAT_FIELDS, table.T))
+
+@lru_cache(maxsize=256)
+def _trip_stats(rows: Tuple[tuple, ...]) -> TripStats:
+    """TripStats for a non-empty tuple of trip rows, memoized by content.
+
+    The app rebuilds user_data on every request, so this is what lets a user
+    whose recent trips have not changed skip the arithmetic next time.
+    """
+    count = len(rows)
+    # A single column-wise reduction yields every total at once
+    total_speed, total_distance, total_fuel, total_rpm, total_brakes = (
+        np.array(rows, dtype=np.float64).sum(axis=0).tolist()
+    )
+    return TripStats(
+        count, total_distance, total_fuel, int(total_brakes),
+        total_speed / count, total_fuel / count, total_rpm / count, total_brakes / count
+    )
+
+def _best_group(matches, ranks: Dict[str, int], skip: Optional[str] = None) -> Optional[str]:
+    """Best-ranked named group among regex matches, or None.
+
+    Stops scanning as soon as the top-ranked group is seen, since nothing
+    later in the message can beat it.
+    """
+    best, best_rank = None, len(ranks)
+    for match in matches:
+        group = match.lastgroup
+        rank = ranks[group]
+        if rank < best_rank and group != skip:
+            best, best_rank = group, rank
+            if rank == 0:
+                break
+    return best
+
+@lru_cache(maxsize=512)
+def _route_message(message: str, has_user_data: bool) -> Tuple[Optional[str], Optional[str]]:
+    """(category, keyword group) a message dispatches to; at most one is set.
+
+    Routing depends only on the text and on whether user data is present, so
+    repeated questions skip both regex scans. The replies themselves are
+    still built per call from the current trips and session.
+    """
+    # Categories keep their declaration order as priority, not their position
+    # in the message, so pick the best-ranked hit rather than the first one
+    category = _best_group(_CATEGORY_RE.finditer(message), _CATEGORY_RANK,
+                           skip=None if has_user_data else 'trip_data')
+    if category:
+        return category, None
+    keyword = _best_group(_KEYWORD_RE.finditer(message), _KEYWORD_RANK)
+    if keyword is None:
+        words = set(_WORD_RE.findall(message.lower()))
+        if 'how' in words and not words.isdisjoint(_IMPROVEMENT_WORDS):
+            keyword = 'improvement'
+    return None, keyword
+
+class _ChatbotCore:
+    """Process-wide chatbot state: response rotation and the NLP engine.
+
+    The app builds a VehicleChatbot per request, so anything that is not
+    session state lives here or at module level and is set up once per process.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        # Canned responses rotate per category across every chatbot in the
+        # process; next() on a cycle is a single C call, safe under the GIL
+        self.response_cycles = {category: cycle(responses) for category, responses in _RESPONSES.items()}
+        
+        # The NLP engine pulls in spaCy and transformers, so it is only
+        # loaded the first time a reply actually needs it
+        self._nlp_engine = None
+        self._nlp_tried = False
+
+    @property
+    def nlp_engine(self):
+        """The NLP engine, loaded on first access; None if unavailable"""
+        if not self._nlp_tried:
+            with self._lock:
+                if not self._nlp_tried:
+                    if NLP_AVAILABLE:
+                        try:
+                            self._nlp_engine = NLPEngine.get()
+                            print("✅ Advanced NLP engine loaded")
+                        except Exception as e:
+                            print(f"⚠️ NLP engine failed to load: {e}")
+                    self._nlp_tried = True
+        return self._nlp_engine
+
+    def analyze(self, message: str) -> Tuple[Dict, Dict]:
+        """(nlp_analysis, response_strategy) for a message; the engine caches the analysis"""
+        nlp_analysis = self.nlp_engine.analyze_message(message)
+        return nlp_analysis, self.nlp_engine.get_response_strategy(nlp_analysis)
+
+    @classmethod
+    def get(cls) -> '_ChatbotCore':
+        """Return the shared core, creating it on first use"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
 class VehicleChatbot:
+    # Only session state is per instance; the static tables are shared
+    __slots__ = ('session_memory', 'conversation_history', '_last_bot_response',
+                 '_topics', '_user_message_count', 'user_context', '_core')
+
+    responses = _RESPONSES
+    patterns = _CATEGORY_PATTERNS
+    intent_keywords = _INTENT_KEYWORDS
+
+    # Report templates, filled from a TripStats via str.format
+    _ANALYSIS_TMPL = (
+        "📈 Analysis of your recent {stats.count} trips:\n\n"
+        "🛣️ Total distance: {stats.total_distance:.1f} km\n"
+        "⚡ Average speed: {stats.avg_speed:.1f} km/h\n"
+        "⛽ Average fuel consumption: {stats.avg_fuel:.1f} L\n"
+        "🔧 Average max RPM: {stats.avg_rpm:.0f}\n"
+        "🛑 Total brake events: {stats.total_brake_events}\n\n"
+    )
+    _VEHICLE_STATS_TMPL = (
+        "📊 Recent Performance:\n"
+        "• Total distance: {stats.total_distance:.1f} km\n"
+        "• Average fuel consumption: {stats.avg_fuel:.1f} L per trip\n"
+        "• Fuel efficiency: {efficiency:.1f} km/L"
+    )
+
     def __init__(self):
         self.session_memory = {}
-        self.conversation_history = []
+        # (sender, message, monotonic time) tuples, bounded so long sessions
+        # don't grow without limit; the latest bot reply is tracked
+        # separately for follow-up questions
+        self.conversation_history = deque(maxlen=HISTORY_MAXLEN)
+        self._last_bot_response = None
+        # Topics (in order of first mention) and user message count for the
+        # conversation summary, kept up to date as messages arrive
+        self._topics = {}
+        self._user_message_count = 0
         self.user_context = {}
         
-        # Initialize NLP engine if available
-        self.nlp_engine = None
-        if NLP_AVAILABLE:
-            try:
-                self.nlp_engine = NLPEngine()
-                print("✅ Advanced NLP engine loaded")
-            except Exception as e:
-                print(f"⚠️ NLP engine failed to load: {e}")
-                self.nlp_engine = None
-        self.responses = {
-            'greeting': [
-                "Hello! I'm your vehicle assistant. How can I help you today?",
-                "Hi there! I can help you with driving tips and vehicle data analysis.",
-                "Welcome! Ask me about your driving performance or vehicle maintenance.",
-                "Good day! Ready to optimize your driving experience?",
-                "Hey! I'm here to help with all your vehicle questions."
-            ],
-            'driving_tips': [
-                "🚗 Eco-driving tips:\n• Maintain steady speeds (50-80 km/h is optimal)\n• Avoid rapid acceleration and hard braking\n• Keep tires properly inflated\n• Remove excess weight from your vehicle",
-                "🛣️ Highway driving tips:\n• Use cruise control when possible\n• Maintain 3-second following distance\n• Plan lane changes early\n• Keep windows closed at high speeds",
-                "🏙️ City driving tips:\n• Anticipate traffic lights\n• Coast to red lights instead of braking hard\n• Use gentle acceleration from stops\n• Avoid rush hour when possible"
-            ],
-            'fuel_efficiency': [
-                "⛽ Fuel efficiency strategies:\n• Drive at steady speeds between 50-80 km/h\n• Avoid excessive idling (turn off engine if waiting >30 seconds)\n• Maintain proper tire pressure\n• Use air conditioning wisely",
-                "💡 Advanced fuel tips:\n• Combine multiple errands into one trip\n• Remove roof racks when not in use\n• Keep up with regular maintenance\n• Use the recommended grade of motor oil",
-                "📊 Your fuel consumption can improve by 10-15% with:\n• Smooth acceleration and braking\n• Proper vehicle maintenance\n• Route planning to avoid traffic\n• Maintaining optimal tire pressure"
-            ],
-            'maintenance': [
-                "🔧 Essential maintenance schedule:\n• Oil change: Every 5,000-7,500 miles\n• Tire rotation: Every 6,000-8,000 miles\n• Brake inspection: Every 12,000 miles\n• Air filter: Every 12,000-15,000 miles",
-                "📅 Monthly checks:\n• Tire pressure and tread depth\n• Fluid levels (oil, coolant, brake)\n• Lights and signals\n• Battery terminals\n• Windshield wipers",
-                "⚠️ Warning signs to watch for:\n• Dashboard warning lights\n• Unusual noises or vibrations\n• Changes in steering or braking\n• Fluid leaks under the vehicle\n• Decreased fuel efficiency"
-            ],
-            'safety': [
-                "🛡️ Safety reminders:\n• Always wear your seatbelt\n• Adjust mirrors before driving\n• Keep a safe following distance\n• Avoid phone use while driving\n• Check blind spots before changing lanes",
-                "🌧️ Weather driving tips:\n• Reduce speed in rain/snow\n• Increase following distance\n• Use headlights in poor visibility\n• Avoid sudden movements\n• Keep emergency kit in car"
-            ],
-            'default': [
-                "I can help you with:\n🚗 Driving tips and techniques\n⛽ Fuel efficiency advice\n🔧 Maintenance schedules\n📊 Trip data analysis\n🛡️ Safety reminders\n\nWhat interests you most?",
-                "Ask me about:\n• Your driving performance\n• Fuel-saving techniques\n• Vehicle maintenance\n• Safety tips\n• Trip analysis\n• Weather driving conditions",
-                "I'm your vehicle expert! Try asking:\n• 'How can I save fuel?'\n• 'Analyze my trips'\n• 'Give me safety tips'\n• 'What maintenance do I need?'"
-            ]
-        }
-        
-        self.patterns = {
-            'greeting': [r'\b(hi|hello|hey|good morning|good afternoon|good evening|greetings)\b'],
-            'driving_tips': [r'\b(driving tips|drive better|improve driving|safe driving|how to drive|driving advice)\b'],
-            'fuel_efficiency': [r'\b(fuel|efficiency|mpg|gas|consumption|save fuel|mileage|economy|eco.?driving)\b'],
-            'maintenance': [r'\b(maintenance|service|oil change|tire|brake|check|repair|schedule|servicing)\b'],
-            'trip_data': [r'\b(trip|data|distance|speed|rpm|analysis|analyze|performance|stats|metrics)\b'],
-            'safety': [r'\b(safety|safe|accident|crash|seatbelt|emergency|hazard)\b'],
-            'weather': [r'\b(weather|rain|snow|fog|storm|winter|summer|conditions)\b'],
-            'route': [r'\b(route|navigation|directions|path|way|road)\b'],
-            'cost': [r'\b(cost|money|expensive|cheap|budget|price|save)\b']
-        }
-        
-        self.intent_keywords = {
-            'question': ['what', 'how', 'why', 'when', 'where', 'which', 'who'],
-            'request': ['can you', 'could you', 'please', 'help me', 'show me'],
-            'comparison': ['vs', 'versus', 'compare', 'better', 'worse', 'difference'],
-            'improvement': ['improve', 'better', 'optimize', 'enhance', 'increase']
-        }
+        # Response rotation and the NLP engine come from the shared core
+        self._core = _ChatbotCore.get()
+
+    @property
+    def nlp_engine(self):
+        return self._core.nlp_engine
 
     def get_response(self, message: str, user_data: Optional[Dict] = None) -> str:
         original_message = message
-        message_lower = message.lower().strip()
+        message = message.strip()
         
         # Store conversation history
-        self.conversation_history.append({'user': original_message, 'timestamp': datetime.now()})
+        self.conversation_history.append(('user', original_message, time.monotonic()))
+        self._note_topics(original_message)
         
         # Update user context
         if user_data:
             self.user_context.update(user_data)
         
+        # Trivial messages skip NLP, intent detection and pattern matching
+        fast = _FASTPATH_RE.match(message)
+        if fast:
+            response = self._fastpath_reply(fast.group(1))
+            self._add_to_history('bot', response)
+            return response
+        
         # Advanced NLP analysis if available
         nlp_analysis = None
         response_strategy = None
         if self.nlp_engine:
             try:
-                nlp_analysis = self.nlp_engine.analyze_message(original_message)
-                response_strategy = self.nlp_engine.get_response_strategy(nlp_analysis)
+                nlp_analysis, response_strategy = self._core.analyze(original_message)
             except Exception as e:
                 print(f"NLP analysis failed: {e}")
         
         # Detect intent (enhanced with NLP if available)
-        intent = self._detect_intent_enhanced(message_lower, nlp_analysis)
+        intent = self._detect_intent_enhanced(message, nlp_analysis)
         
         # Check for patterns with priority
-        response = self._pattern_matching_enhanced(message_lower, user_data, intent, nlp_analysis)
+        response = self._pattern_matching_enhanced(message, user_data, intent, nlp_analysis)
         if response:
             # Enhance response with NLP insights
             if self.nlp_engine and nlp_analysis and response_strategy:
@@ -111,7 +415,7 @@ class VehicleChatbot:
             return response
         
         # Contextual responses based on conversation history
-        context_response = self._contextual_response(message_lower, user_data)
+        context_response = self._contextual_response(message, user_data)
         if context_response:
             if self.nlp_engine and nlp_analysis and response_strategy:
                 context_response = self.nlp_engine.enhance_response(context_response, nlp_analysis, response_strategy)
@@ -119,16 +423,27 @@ class VehicleChatbot:
             return context_response
         
         # Default intelligent response
-        default_response = self._intelligent_default(message_lower, user_data, nlp_analysis)
+        default_response = self._intelligent_default(message, user_data, nlp_analysis)
         if self.nlp_engine and nlp_analysis and response_strategy:
             default_response = self.nlp_engine.enhance_response(default_response, nlp_analysis, response_strategy)
         self._add_to_history('bot', default_response)
         return default_response
     
+    def _fastpath_reply(self, word: str) -> str:
+        """Reply to a bare greeting, thanks or help request"""
+        kind = _FASTPATH_KINDS[word.lower()]
+        if kind == 'greeting':
+            return self._pick('greeting')
+        return getattr(self, _KEYWORD_HANDLERS[kind])()
+    
     def _detect_intent(self, message: str) -> str:
         """Detect user intent from message"""
-        for intent, keywords in self.intent_keywords.items():
-            if any(keyword in message for keyword in keywords):
+        tokens = set(_WORD_RE.findall(message.lower()))
+        for intent, words in _INTENT_WORDS.items():
+            if not tokens.isdisjoint(words):
+                return intent
+            phrases = _INTENT_PHRASES.get(intent)
+            if phrases and phrases.search(message):
                 return intent
         return 'statement'
     
@@ -154,7 +469,10 @@ class VehicleChatbot:
             # Handle specific entity-based responses
             if 'speed' in entities:
                 speed_values = entities['speed']
-                return f"🚗 I see you mentioned {speed_values[0]} speed. Here's what I recommend for optimal efficiency at that speed:\n\n" + self._speed_specific_advice(speed_values[0])
+                # The speed entity is usually the bare number already
+                number = _NUMBER_RE.search(speed_values[0])
+                speed_val = float(number.group()) if number else None
+                return f"🚗 I see you mentioned {speed_values[0]} speed. Here's what I recommend for optimal efficiency at that speed:\n\n" + self._speed_specific_advice(speed_val)
             
             if 'fuel' in entities:
                 fuel_values = entities['fuel']
@@ -165,27 +483,28 @@ class VehicleChatbot:
     
     def _pattern_matching(self, message: str, user_data: Optional[Dict], intent: str) -> Optional[str]:
         """Enhanced pattern matching with context"""
-        for category, patterns in self.patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, message, re.IGNORECASE):
-                    if category == 'trip_data' and user_data:
-                        return self._analyze_trip_data(user_data)
-                    elif category == 'weather':
-                        return self._weather_driving_advice()
-                    elif category == 'route':
-                        return self._route_advice()
-                    elif category == 'cost':
-                        return self._cost_saving_tips(user_data)
-                    elif category in self.responses:
-                        return self._contextual_response_selection(category, intent, user_data)
+        category, keyword = _route_message(message, bool(user_data))
+        if category:
+            if category == 'trip_data':
+                return self._analyze_trip_data(user_data)
+            elif category == 'weather':
+                return self._weather_driving_advice()
+            elif category == 'route':
+                return self._route_advice()
+            elif category == 'cost':
+                return self._cost_saving_tips(user_data)
+            elif category in self.responses:
+                return self._contextual_response_selection(category, intent, user_data)
         
         # Specific keyword handling
-        return self._handle_specific_keywords(message, user_data)
+        return self._handle_specific_keywords(keyword, user_data)
+    
+    def _pick(self, category: str) -> str:
+        """Next canned response for a category, in round-robin order"""
+        return next(self._core.response_cycles[category])
     
     def _contextual_response_selection(self, category: str, intent: str, user_data: Optional[Dict]) -> str:
         """Select response based on context and intent"""
-        responses = self.responses[category]
-        
         # Personalize based on user data
         if user_data and user_data.get('recent_trips'):
             if category == 'fuel_efficiency':
@@ -193,70 +512,50 @@ class VehicleChatbot:
             elif category == 'driving_tips':
                 return self._personalized_driving_tips(user_data)
         
-        return random.choice(responses)
+        return self._pick(category)
     
-    def _handle_specific_keywords(self, message: str, user_data: Optional[Dict]) -> Optional[str]:
+    def _handle_specific_keywords(self, keyword: Optional[str], user_data: Optional[Dict]) -> Optional[str]:
         """Handle specific keywords and phrases"""
-        keyword_handlers = {
-            ('score', 'performance', 'rating'): lambda: self._performance_advice(user_data),
-            ('alert', 'warning', 'problem'): lambda: self._alert_advice(),
-            ('thank', 'thanks'): lambda: self._gratitude_response(),
-            ('help', 'what can you do'): lambda: self._show_capabilities(),
-            ('rpm', 'revolutions'): lambda: self._rpm_advice(user_data),
-            ('acceleration', 'accelerate'): lambda: self._acceleration_advice(),
-            ('vehicle', 'car', 'my car'): lambda: self._vehicle_info(user_data),
-            ('compare', 'comparison', 'vs'): lambda: self._comparison_analysis(user_data),
-            ('week', 'weekly', 'summary'): lambda: self._weekly_summary(user_data),
-            ('streak', 'consistent', 'progress'): lambda: self._streak_analysis(user_data)
-        }
-        
-        for keywords, handler in keyword_handlers.items():
-            if any(word in message for word in keywords):
-                return handler()
-        
-        if 'how' in message and any(word in message for word in ['improve', 'better']):
-            return self._improvement_suggestions(user_data)
+        if keyword:
+            return getattr(self, _KEYWORD_HANDLERS[keyword])(user_data)
         
         return None
     
     def _contextual_response(self, message: str, user_data: Optional[Dict]) -> Optional[str]:
         """Generate contextual responses based on conversation history"""
         if len(self.conversation_history) > 1:
-            last_bot_response = next((item['bot'] for item in reversed(self.conversation_history) if 'bot' in item), None)
+            last_bot_response = self._last_bot_response
             
             # Follow-up questions
-            if last_bot_response and 'fuel' in last_bot_response.lower():
-                if any(word in message for word in ['more', 'tell me', 'explain']):
+            if last_bot_response and _FUEL_RE.search(last_bot_response):
+                if _FOLLOW_UP_RE.search(message):
                     return self._detailed_fuel_tips(user_data)
             
             # Clarification requests
-            if any(word in message for word in ['what do you mean', 'explain', 'clarify']):
+            if _CLARIFY_RE.search(message):
                 return "Let me clarify! I can help you with:\n• Analyzing your driving patterns\n• Fuel efficiency tips\n• Maintenance schedules\n• Safety advice\n\nWhat specific area interests you?"
         
         return None
     
-    def _speed_specific_advice(self, speed: str) -> str:
-        """Provide speed-specific advice"""
-        try:
-            speed_val = float(re.findall(r'\d+(?:\.\d+)?', speed)[0])
-            if speed_val > 100:
-                return "That's quite fast! Consider reducing speed to 80-90 km/h for better fuel efficiency and safety."
-            elif speed_val > 80:
-                return "Good highway speed! You're in the efficient range. Maintain steady speeds for best results."
-            elif speed_val > 50:
-                return "Perfect speed range for fuel efficiency! This is the sweet spot for most vehicles."
-            else:
-                return "City driving speeds are great for fuel economy. Focus on smooth acceleration and braking."
-        except:
+    def _speed_specific_advice(self, speed_val: Optional[float]) -> str:
+        """Provide speed-specific advice for a speed in km/h, if one was parsed"""
+        if speed_val is None:
             return "Speed management is key to efficient driving. Aim for 50-80 km/h when possible."
+        if speed_val > 100:
+            return "That's quite fast! Consider reducing speed to 80-90 km/h for better fuel efficiency and safety."
+        elif speed_val > 80:
+            return "Good highway speed! You're in the efficient range. Maintain steady speeds for best results."
+        elif speed_val > 50:
+            return "Perfect speed range for fuel efficiency! This is the sweet spot for most vehicles."
+        else:
+            return "City driving speeds are great for fuel economy. Focus on smooth acceleration and braking."
     
     def _fuel_specific_advice(self, fuel: str, user_data: Optional[Dict]) -> str:
         """Provide fuel-specific advice"""
         base_advice = "Here are ways to optimize your fuel consumption:\n• Maintain steady speeds\n• Avoid rapid acceleration\n• Keep tires properly inflated\n• Remove excess weight"
         
         if user_data and user_data.get('recent_trips'):
-            trips = user_data['recent_trips']
-            avg_fuel = sum(trip.get('fuel_consumed', 0) for trip in trips) / len(trips)
+            avg_fuel = self._stats(user_data).avg_fuel
             base_advice += f"\n\n📊 Your average fuel consumption: {avg_fuel:.1f}L per trip"
         
         return base_advice
@@ -287,11 +586,48 @@ class VehicleChatbot:
         if len(message.split()) > 5:  # Longer messages
             return "I understand you're asking about vehicle-related topics. I can help with driving tips, fuel efficiency, maintenance, and trip analysis. Could you be more specific about what you'd like to know?"
         
-        return random.choice(self.responses['default'])
+        return self._pick('default')
+    
+    def _note_topics(self, message: str):
+        """Count a user message and record the categories it touches for the summary"""
+        self._user_message_count += 1
+        # Patterns are precompiled with re.IGNORECASE, so the message is
+        # matched as stored; categories already seen are not searched again
+        for category, category_patterns in self.patterns.items():
+            if category not in self._topics and any(pattern.search(message) for pattern in category_patterns):
+                self._topics[category] = None
     
     def _add_to_history(self, sender: str, message: str):
         """Add message to conversation history"""
-        self.conversation_history.append({sender: message, 'timestamp': datetime.now()})
+        self.conversation_history.append((sender, message, time.monotonic()))
+        if sender == 'bot':
+            self._last_bot_response = message
+
+    def _trip_table(self, user_data):
+        """Cached (trips, count, table, columns) for the recent trips.
+
+        table is a (count x TRIP_STAT_FIELDS) float64 array and columns maps
+        each field to its column view; both are cached on user_data.
+        """
+        trips = user_data['recent_trips']
+        cached = user_data.get('_np')
+        if cached is None or cached[0] is not trips or cached[1] != len(trips):
+            table, columns = _to_soa(trips)
+            cached = user_data['_np'] = (trips, len(trips), table, columns)
+        return cached
+
+    def _trip_arrays(self, user_data):
+        """Column arrays of TRIP_STAT_FIELDS for the recent trips"""
+        return self._trip_table(user_data)[3]
+
+    def _stats(self, user_data):
+        """TripStats for the recent trips, computed once and cached on user_data"""
+        trips = user_data['recent_trips']
+        cached = user_data.get('_stats_cache')
+        if cached is None or cached[0] is not trips or cached[1] != len(trips):
+            stats = _trip_stats(_trip_rows(trips))
+            cached = user_data['_stats_cache'] = (trips, len(trips), stats)
+        return cached[2]
 
     def _analyze_trip_data(self, user_data):
         if not user_data or 'recent_trips' not in user_data:
@@ -301,52 +637,44 @@ class VehicleChatbot:
         if not trips:
             return "🚗 You don't have any recent trips to analyze. Start driving to see personalized insights!"
         
-        avg_speed = sum(trip.get('avg_speed_kmph', 0) for trip in trips) / len(trips)
-        total_distance = sum(trip.get('distance_km', 0) for trip in trips)
-        avg_fuel = sum(trip.get('fuel_consumed', 0) for trip in trips) / len(trips)
-        avg_rpm = sum(trip.get('max_rpm', 0) for trip in trips) / len(trips)
-        total_brake_events = sum(trip.get('brake_events', 0) for trip in trips)
-        
-        analysis = f"📈 Analysis of your recent {len(trips)} trips:\n\n"
-        analysis += f"🛣️ Total distance: {total_distance:.1f} km\n"
-        analysis += f"⚡ Average speed: {avg_speed:.1f} km/h\n"
-        analysis += f"⛽ Average fuel consumption: {avg_fuel:.1f} L\n"
-        analysis += f"🔧 Average max RPM: {avg_rpm:.0f}\n"
-        analysis += f"🛑 Total brake events: {total_brake_events}\n\n"
+        stats = self._stats(user_data)
+        analysis = self._ANALYSIS_TMPL.format(stats=stats)
         
         # Personalized recommendations
-        recommendations = "💡 Recommendations:\n"
-        if avg_speed > 80:
-            recommendations += "• Consider reducing speed to 70-80 km/h for 15% better fuel efficiency\n"
-        elif avg_speed < 40:
-            recommendations += "• Your city driving speeds are excellent for fuel economy\n"
+        recommendations = [_RECOMMENDATIONS_HEADER]
+        if stats.avg_speed > 80:
+            recommendations.append(_TIP_REDUCE_SPEED)
+        elif stats.avg_speed < 40:
+            recommendations.append(_TIP_CITY_SPEED)
         
-        if avg_rpm > 3000:
-            recommendations += "• Try to keep RPM under 3000 for better engine efficiency\n"
+        if stats.avg_rpm > 3000:
+            recommendations.append(_TIP_LOWER_RPM)
         
-        if total_brake_events > len(trips) * 10:
-            recommendations += "• Work on smoother driving to reduce brake events\n"
+        if stats.total_brake_events > len(trips) * 10:
+            recommendations.append(_TIP_SMOOTHER_BRAKING)
         else:
-            recommendations += "• Great job on smooth driving with minimal braking!\n"
+            recommendations.append(_TIP_SMOOTH_BRAKING)
         
-        return analysis + recommendations
+        recommendations.append("")
+        return analysis + "\n".join(recommendations)
     
     def _weather_driving_advice(self) -> str:
         """Weather-specific driving advice"""
-        return "🌦️ Weather Driving Tips:\n\n🌧️ **Rain:**\n• Reduce speed by 10-15%\n• Increase following distance to 4+ seconds\n• Use headlights even during day\n• Avoid sudden movements\n\n❄️ **Snow/Ice:**\n• Drive 50% slower than normal\n• Brake gently and early\n• Accelerate slowly\n• Keep emergency kit in car\n\n🌫️ **Fog:**\n• Use low beam headlights\n• Follow road markings\n• Increase following distance\n• Pull over if visibility is too poor"
+        return _WEATHER_ADVICE
     
     def _route_advice(self) -> str:
         """Route planning and navigation advice"""
-        return "🗺️ Smart Route Planning:\n\n📱 **Before You Go:**\n• Check traffic conditions\n• Plan fuel stops for long trips\n• Consider alternate routes\n• Update GPS maps regularly\n\n⛽ **Fuel Efficiency Routes:**\n• Avoid heavy traffic areas\n• Choose highways over city streets\n• Plan errands in one trip\n• Use route optimization apps\n\n🚗 **Safety First:**\n• Share your route with someone\n• Check weather conditions\n• Ensure vehicle is road-ready"
+        return _ROUTE_ADVICE
     
     def _cost_saving_tips(self, user_data: Optional[Dict]) -> str:
         """Cost-saving driving tips"""
-        base_tips = "💰 Cost-Saving Driving Tips:\n\n⛽ **Fuel Costs:**\n• Maintain steady speeds (50-80 km/h)\n• Remove excess weight\n• Keep tires properly inflated\n• Combine multiple errands\n\n🔧 **Maintenance Costs:**\n• Follow service schedules\n• Check fluids regularly\n• Address issues early\n• Learn basic maintenance\n\n🚗 **Smart Driving:**\n• Avoid rush hour when possible\n• Use cruise control on highways\n• Plan efficient routes"
+        base_tips = _COST_SAVING_TIPS
         
         if user_data and user_data.get('recent_trips'):
             trips = user_data['recent_trips']
-            avg_fuel = sum(trip.get('fuel_consumed', 0) for trip in trips) / len(trips)
-            total_distance = sum(trip.get('distance_km', 0) for trip in trips)
+            stats = self._stats(user_data)
+            avg_fuel = stats.avg_fuel
+            total_distance = stats.total_distance
             
             if avg_fuel > 0:
                 efficiency = total_distance / (avg_fuel * len(trips))
@@ -358,10 +686,11 @@ class VehicleChatbot:
         """Personalized fuel efficiency advice based on user data"""
         trips = user_data.get('recent_trips', [])
         if not trips:
-            return random.choice(self.responses['fuel_efficiency'])
+            return self._pick('fuel_efficiency')
         
-        avg_speed = sum(trip.get('avg_speed_kmph', 0) for trip in trips) / len(trips)
-        avg_rpm = sum(trip.get('max_rpm', 0) for trip in trips) / len(trips)
+        stats = self._stats(user_data)
+        avg_speed = stats.avg_speed
+        avg_rpm = stats.avg_rpm
         
         advice = "⛽ **Personalized Fuel Tips for You:**\n\n"
         
@@ -381,10 +710,11 @@ class VehicleChatbot:
         """Personalized driving tips based on user patterns"""
         trips = user_data.get('recent_trips', [])
         if not trips:
-            return random.choice(self.responses['driving_tips'])
+            return self._pick('driving_tips')
         
-        avg_brake_events = sum(trip.get('brake_events', 0) for trip in trips) / len(trips)
-        avg_speed = sum(trip.get('avg_speed_kmph', 0) for trip in trips) / len(trips)
+        stats = self._stats(user_data)
+        avg_brake_events = stats.avg_brake_events
+        avg_speed = stats.avg_speed
         
         tips = "🚗 **Personalized Driving Tips:**\n\n"
         
@@ -400,61 +730,53 @@ class VehicleChatbot:
     
     def _detailed_fuel_tips(self, user_data: Optional[Dict]) -> str:
         """Detailed fuel efficiency explanation"""
-        return "🔍 **Detailed Fuel Efficiency Guide:**\n\n🏎️ **Speed & Efficiency:**\n• 50-80 km/h: Optimal efficiency zone\n• Every 10 km/h over 80: ~10% more fuel\n• Highway vs city: 15-20% difference\n\n🚗 **Driving Techniques:**\n• Gradual acceleration (0-60 in 15+ seconds)\n• Anticipate stops (coast vs brake)\n• Maintain steady speeds\n• Use cruise control on highways\n\n🔧 **Vehicle Factors:**\n• Tire pressure: 3% efficiency per 1 PSI low\n• Weight: 2% per 100 lbs excess\n• Aerodynamics: Windows vs A/C at speed\n• Engine maintenance: 4% with proper tune-up"
+        return _DETAILED_FUEL_TIPS
     
-    def _alert_advice(self) -> str:
+    def _alert_advice(self, user_data: Optional[Dict] = None) -> str:
         """Enhanced alert and warning advice"""
-        return "⚠️ **Vehicle Alert Guide:**\n\n🚨 **Immediate Action Required:**\n• Engine temperature warning\n• Oil pressure light\n• Brake system warning\n• Battery/charging system\n\n⚡ **Soon (within days):**\n• Low tire pressure\n• Fuel level low\n• Maintenance due\n• Check engine light\n\n📅 **Preventive Monitoring:**\n• Dashboard warning lights\n• Unusual noises or vibrations\n• Changes in performance\n• Fluid leaks\n\n💡 **Pro Tip:** Address warnings early to prevent costly repairs!"
+        return _ALERT_ADVICE
     
-    def _gratitude_response(self) -> str:
+    def _gratitude_response(self, user_data: Optional[Dict] = None) -> str:
         """Varied gratitude responses"""
-        responses = [
-            "You're welcome! Drive safely! 🚗",
-            "Happy to help! Stay safe on the roads! 🛣️",
-            "Anytime! Feel free to ask more questions. 🤖",
-            "Glad I could assist! Keep up the good driving! 👍",
-            "My pleasure! Remember, safe driving saves lives and money! 💰"
-        ]
-        return random.choice(responses)
-    
-    def _acceleration_advice(self) -> str:
+        return self._pick('gratitude')
+    
+    def _acceleration_advice(self, user_data: Optional[Dict] = None) -> str:
         """Enhanced acceleration advice"""
-        return "🚀 **Smart Acceleration Guide:**\n\n⚡ **Fuel-Efficient Acceleration:**\n• 0-60 km/h in 15+ seconds\n• Keep RPM under 3000\n• Use 75% throttle maximum\n• Shift at 2500 RPM (manual)\n\n🏁 **Performance vs Economy:**\n• Aggressive: 0-60 in <10 sec (40% more fuel)\n• Normal: 0-60 in 10-15 sec (balanced)\n• Eco: 0-60 in 15+ sec (optimal efficiency)\n\n🎯 **Technique Tips:**\n• Smooth, progressive pressure\n• Anticipate traffic flow\n• Use eco-mode when available\n• Coast to decelerate when possible"
+        return _ACCELERATION_ADVICE
 
     def _performance_advice(self, user_data):
         if not user_data or not user_data.get('recent_trips'):
             return "🏆 General performance tips:\n• Maintain steady speeds (50-80 km/h optimal)\n• Avoid harsh braking and acceleration\n• Plan routes to avoid traffic\n• Keep RPM under 3000\n• Regular vehicle maintenance"
         
-        trips = user_data['recent_trips']
-        avg_speed = sum(trip.get('avg_speed_kmph', 0) for trip in trips) / len(trips)
-        avg_rpm = sum(trip.get('max_rpm', 0) for trip in trips) / len(trips)
+        stats = self._stats(user_data)
+        avg_speed = stats.avg_speed
+        avg_rpm = stats.avg_rpm
         
-        advice = "🎯 Personalized performance tips:\n\n"
+        advice = ["🎯 Personalized performance tips:\n"]
         
         if avg_speed > 90:
-            advice += "🐌 Speed: Consider slowing down - you're averaging {:.1f} km/h\n".format(avg_speed)
+            advice.append("🐌 Speed: Consider slowing down - you're averaging {:.1f} km/h".format(avg_speed))
         elif avg_speed < 30:
-            advice += "🚦 Speed: Your low average speed suggests city driving - great for efficiency!\n"
+            advice.append("🚦 Speed: Your low average speed suggests city driving - great for efficiency!")
         else:
-            advice += "✅ Speed: Your average speed of {:.1f} km/h is in the efficient range\n".format(avg_speed)
+            advice.append("✅ Speed: Your average speed of {:.1f} km/h is in the efficient range".format(avg_speed))
         
         if avg_rpm > 3500:
-            advice += "🔧 RPM: Try shifting earlier or driving more gently (current avg: {:.0f} RPM)\n".format(avg_rpm)
+            advice.append("🔧 RPM: Try shifting earlier or driving more gently (current avg: {:.0f} RPM)".format(avg_rpm))
         else:
-            advice += "✅ RPM: Good engine management with average {:.0f} RPM\n".format(avg_rpm)
+            advice.append("✅ RPM: Good engine management with average {:.0f} RPM".format(avg_rpm))
         
-        advice += "\n📊 Check your trip details for specific metrics and trends!"
-        return advice
+        advice.append("\n📊 Check your trip details for specific metrics and trends!")
+        return "\n".join(advice)
     
-    def _show_capabilities(self):
-        return "🤖 I can help you with:\n\n🚗 Driving Tips & Techniques\n⛽ Fuel Efficiency Strategies\n🔧 Maintenance Schedules\n📊 Trip Data Analysis\n🛡️ Safety Reminders\n💰 Cost-Saving Tips\n\nJust ask me anything about your vehicle!"
+    def _show_capabilities(self, user_data=None):
+        return _CAPABILITIES
     
     def _rpm_advice(self, user_data):
         base_advice = "🔧 RPM (Revolutions Per Minute) tips:\n\n• Keep RPM between 1500-3000 for efficiency\n• Shift gears before reaching 3000 RPM (manual)\n• Higher RPM = more fuel consumption\n• Lower RPM in higher gears saves fuel\n"
         
         if user_data and user_data.get('recent_trips'):
-            trips = user_data['recent_trips']
-            avg_rpm = sum(trip.get('max_rpm', 0) for trip in trips) / len(trips)
+            avg_rpm = self._stats(user_data).avg_rpm
             base_advice += f"\n📊 Your average max RPM: {avg_rpm:.0f}\n"
             
             if avg_rpm > 4000:
@@ -467,10 +789,7 @@ class VehicleChatbot:
         return base_advice
     
     def _improvement_suggestions(self, user_data):
-        suggestions = "🚀 Ways to improve your driving:\n\n"
-        suggestions += "1️⃣ **Fuel Efficiency:**\n   • Maintain 50-80 km/h when possible\n   • Avoid rapid acceleration\n   • Plan routes to minimize stops\n\n"
-        suggestions += "2️⃣ **Safety:**\n   • Increase following distance\n   • Check mirrors every 5-8 seconds\n   • Anticipate other drivers' actions\n\n"
-        suggestions += "3️⃣ **Vehicle Care:**\n   • Regular maintenance checks\n   • Monitor tire pressure monthly\n   • Keep emergency kit in car\n\n"
+        suggestions = _IMPROVEMENT_SUGGESTIONS
         
         if user_data and user_data.get('recent_trips'):
             suggestions += "📊 Check your dashboard for personalized insights based on your driving data!"
@@ -481,18 +800,12 @@ class VehicleChatbot:
         if not user_data or not user_data.get('vehicle_number'):
             return "🚗 I don't have your vehicle information. Please check your profile settings."
         
-        vehicle_num = user_data['vehicle_number']
-        info = f"🚗 Your Vehicle: {vehicle_num}\n\n"
+        info = f"🚗 Your Vehicle: {user_data['vehicle_number']}\n\n"
         
         if user_data.get('recent_trips'):
-            trips = user_data['recent_trips']
-            total_distance = sum(trip.get('distance_km', 0) for trip in trips)
-            avg_fuel = sum(trip.get('fuel_consumed', 0) for trip in trips) / len(trips)
-            
-            info += f"📊 Recent Performance:\n"
-            info += f"• Total distance: {total_distance:.1f} km\n"
-            info += f"• Average fuel consumption: {avg_fuel:.1f} L per trip\n"
-            info += f"• Fuel efficiency: {total_distance/sum(trip.get('fuel_consumed', 1) for trip in trips):.1f} km/L"
+            stats = self._stats(user_data)
+            efficiency = stats.total_distance / stats.total_fuel if stats.total_fuel > 0 else 0
+            info += self._VEHICLE_STATS_TMPL.format(stats=stats, efficiency=efficiency)
         
         return info
     
@@ -523,8 +836,7 @@ class VehicleChatbot:
     
     def _personalized_greeting(self, user_data):
         self.session_memory['greeted'] = True
-        hour = datetime.now().hour
-        greeting = "Good morning!" if hour < 12 else "Good afternoon!" if hour < 17 else "Good evening!"
+        greeting = _GREETINGS[time.localtime().tm_hour]
         
         if user_data and user_data.get('vehicle_number'):
             return f"{greeting} Ready to check your {user_data['vehicle_number']} performance? 🚗"
@@ -534,18 +846,12 @@ class VehicleChatbot:
         if not user_data or not user_data.get('recent_trips'):
             return "🏆 I need trip data to calculate your driving score. Start driving!"
         
-        trips = user_data['recent_trips']
-        score = 10
-        avg_speed = sum(trip.get('avg_speed_kmph', 0) for trip in trips) / len(trips)
-        avg_rpm = sum(trip.get('max_rpm', 0) for trip in trips) / len(trips)
-        avg_brake_events = sum(trip.get('brake_events', 0) for trip in trips) / len(trips)
-        
-        if avg_speed > 90: score -= 2
-        elif avg_speed > 80: score -= 1
-        if avg_rpm > 4000: score -= 2
-        elif avg_rpm > 3000: score -= 1
-        if avg_brake_events > 15: score -= 2
-        elif avg_brake_events > 10: score -= 1
+        stats = self._stats(user_data)
+        # bisect_left counts the thresholds strictly below each average
+        score = (10
+                 - bisect_left(_SPEED_PENALTY_THRESHOLDS, stats.avg_speed)
+                 - bisect_left(_RPM_PENALTY_THRESHOLDS, stats.avg_rpm)
+                 - bisect_left(_BRAKE_PENALTY_THRESHOLDS, stats.avg_brake_events))
         
         score = max(1, min(10, score))
         rating = "🌟 Excellent" if score >= 9 else "👍 Good" if score >= 7 else "⚠️ Average" if score >= 5 else "🔴 Needs Improvement"
@@ -557,8 +863,9 @@ class VehicleChatbot:
             return "📅 I need more trip data for summaries. Keep driving!"
         
         trips = user_data['recent_trips']
-        total_distance = sum(trip.get('distance_km', 0) for trip in trips)
-        total_fuel = sum(trip.get('fuel_consumed', 0) for trip in trips)
+        stats = self._stats(user_data)
+        total_distance = stats.total_distance
+        total_fuel = stats.total_fuel
         efficiency = total_distance / total_fuel if total_fuel > 0 else 0
         
         summary = f"📊 Recent Summary:\n\n🛣️ Trips: {len(trips)}\n📏 Distance: {total_distance:.1f} km\n⛽ Fuel: {total_fuel:.1f} L\n📈 Efficiency: {efficiency:.1f} km/L\n\n"
@@ -576,18 +883,11 @@ class VehicleChatbot:
         if not user_data or not user_data.get('recent_trips'):
             return "🔥 Start driving consistently to build your streak!"
         
-        trips = user_data['recent_trips']
-        streak = 0
-        
-        for trip in trips:
-            speed = trip.get('avg_speed_kmph', 0)
-            rpm = trip.get('max_rpm', 0)
-            brakes = trip.get('brake_events', 0)
-            
-            if 40 <= speed <= 80 and rpm <= 3000 and brakes <= 8:
-                streak += 1
-            else:
-                break
+        arrays = self._trip_arrays(user_data)
+        speed = arrays['avg_speed_kmph']
+        efficient = (speed >= 40) & (speed <= 80) & (arrays['max_rpm'] <= 3000) & (arrays['brake_events'] <= 8)
+        # Length of the leading run of efficient trips: argmin finds the first miss
+        streak = len(efficient) if efficient.all() else int(np.argmin(efficient))
         
         if streak >= 5:
             return f"🔥 Amazing! {streak} efficient trips in a row! 🌟"
@@ -603,19 +903,8 @@ class VehicleChatbot:
         if not self.conversation_history:
             return "No conversation history available."
         
-        user_messages = [item.get('user', '') for item in self.conversation_history if 'user' in item]
-        topics = []
-        
-        for message in user_messages:
-            message_lower = message.lower()
-            for category in self.patterns.keys():
-                for pattern in self.patterns[category]:
-                    if re.search(pattern, message_lower, re.IGNORECASE):
-                        if category not in topics:
-                            topics.append(category)
-        
-        if topics:
-            return f"📋 **Conversation Summary:**\nTopics discussed: {', '.join(topics)}\nTotal messages: {len(user_messages)}"
+        if self._topics:
+            return f"📋 **Conversation Summary:**\nTopics discussed: {', '.join(self._topics)}\nTotal messages: {self._user_message_count}"
         else:
             return "📋 **Conversation Summary:**\nGeneral vehicle assistance discussion"
     
@@ -623,7 +912,7 @@ class VehicleChatbot:
         """Get NLP insights for debugging/analysis"""
         if self.nlp_engine:
             try:
-                return self.nlp_engine.analyze_message(message)
+                return self._core.analyze(message)[0]
             except Exception as e:
                 return {'error': str(e)}
         return {'error': 'NLP engine not available'}
@@ -632,4 +921,7 @@ class VehicleChatbot:
         """Clear session data for new conversation"""
         self.session_memory.clear()
         self.conversation_history.clear()
+        self._last_bot_response = None
+        self._topics.clear()
+        self._user_message_count = 0
         self.user_context.clear()
\ No newline at end of file
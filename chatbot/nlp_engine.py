@@ -1,4 +1,7 @@
+import os
 import re
+import threading
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 import logging
 try:
@@ -19,31 +22,148 @@ except ImportError:
     nltk = None
     SentimentIntensityAnalyzer = None
 
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = TRANSFORMERS_AVAILABLE
+except ImportError:
+    ONNX_AVAILABLE = False
+    ORTModelForSequenceClassification = None
+    AutoTokenizer = None
+
+# int8-quantized ONNX export of the distilbert sentiment model, preferred over
+# the PyTorch pipeline when present. Produce it with
+#   optimum-cli export onnx --model distilbert-base-uncased-finetuned-sst-2-english <dir>
+# followed by optimum.onnxruntime.ORTQuantizer (dynamic int8) on <dir>
+SENTIMENT_ONNX_DIR = os.environ.get(
+    'SENTIMENT_ONNX_DIR', os.path.join(os.path.dirname(__file__), 'models', 'sentiment-int8')
+)
+
+# Set once the VADER lexicon has been fetched, so later engines skip the check
+_NLTK_READY = False
+
+# Distinct messages whose analysis is kept for reuse
+ANALYSIS_CACHE_SIZE = 2048
+
+# Messages per forward pass when the transformers sentiment model runs a batch
+SENTIMENT_BATCH_SIZE = 32
+
+# Compiled once at import; analyze_message runs these on every message
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s.,!?-]')
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_WORD_RE = re.compile(r"[a-z']+")
+# The ASCII characters _SPECIAL_CHARS_RE removes, as a str.translate table
+_ASCII_SPECIAL_CHARS = str.maketrans('', '', ''.join(
+    chr(code) for code in range(128) if _SPECIAL_CHARS_RE.match(chr(code))
+))
+
+# Keyword, sentiment and intent vocabularies, matched against a message's word set
+_VEHICLE_KEYWORDS = (
+    'fuel', 'gas', 'efficiency', 'mileage', 'consumption', 'speed', 'rpm', 'brake',
+    'engine', 'maintenance', 'service', 'oil', 'tire', 'battery', 'transmission',
+    'safety', 'accident', 'crash', 'route', 'navigation', 'traffic', 'cost',
+    'save', 'money', 'performance', 'driving', 'trip', 'distance'
+)
+_VEHICLE_KEYWORD_SET = frozenset(_VEHICLE_KEYWORDS)
+_VEHICLE_KEYWORD_RANK = {keyword: rank for rank, keyword in enumerate(_VEHICLE_KEYWORDS)}
+_POSITIVE_WORDS = frozenset(('good', 'great', 'excellent', 'love', 'like', 'amazing', 'perfect', 'awesome', 'thanks'))
+_NEGATIVE_WORDS = frozenset(('bad', 'terrible', 'awful', 'hate', 'problem', 'issue', 'wrong', 'broken', 'frustrated'))
+_INTENT_KEYWORDS = {
+    'question': ('what', 'how', 'why', 'when', 'where', 'which', 'who', 'is', 'are', 'can', 'could', 'should', 'would'),
+    'request': ('please', 'help', 'show', 'tell', 'give', 'provide', 'explain'),
+    'complaint': ('problem', 'issue', 'wrong', 'bad', 'terrible', 'awful', 'broken', 'not working'),
+    'praise': ('good', 'great', 'excellent', 'amazing', 'perfect', 'love', 'like', 'awesome'),
+    'comparison': ('vs', 'versus', 'compare', 'better', 'worse', 'difference', 'between'),
+    'improvement': ('improve', 'better', 'optimize', 'enhance', 'increase', 'reduce', 'save')
+}
+# (intent, single-word cues, multi-word cues, cue count). Single words are
+# looked up in the word set; the few phrases ('not working') as substrings
+_INTENT_CUES = tuple(
+    (intent,
+     frozenset(keyword for keyword in keywords if ' ' not in keyword),
+     tuple(keyword for keyword in keywords if ' ' in keyword),
+     len(keywords))
+    for intent, keywords in _INTENT_KEYWORDS.items()
+)
+
+def _tokens(message_lower: str) -> frozenset:
+    """Words of an already lower-cased message, plus each plural with its 's' dropped"""
+    words = _WORD_RE.findall(message_lower)
+    return frozenset(words).union([word[:-1] for word in words if word.endswith('s')])
+
+def _rule_settled_sentiment(message: str, tokens: frozenset) -> Optional[Dict]:
+    """Stand-in for the model sentiment when the model call is not worth it.
+
+    A margin of two or more sentiment words is already unambiguous, and one-
+    or two-word messages (greetings, thanks) carry too little for the model.
+    Returns None when the model should be asked.
+    """
+    margin = len(tokens & _POSITIVE_WORDS) - len(tokens & _NEGATIVE_WORDS)
+    if abs(margin) >= 2:
+        return {'label': 'positive' if margin > 0 else 'negative', 'score': min(1.0, abs(margin) / 4)}
+    if len(message.split()) <= 2:
+        return {'label': 'neutral', 'score': 0.5}
+    return None
+
 class NLPEngine:
+    _instance = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls) -> 'NLPEngine':
+        """Return the process-wide engine, loading the models on first use"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
     def __init__(self):
         self.device = 0 if torch.cuda.is_available() else -1
         self._init_models()
+        # Model inference dominates an analysis, so repeated messages (retries,
+        # re-renders) reuse it. Keyed on the exact text: entities depend on
+        # case and word order, so a looser key would return wrong entities
+        self._cached_analysis = lru_cache(maxsize=ANALYSIS_CACHE_SIZE)(self._analyze_message)
         
     def _init_models(self):
         """Initialize NLP models with fallback handling"""
+        global _NLTK_READY
         self.intent_classifier = None
         self.sentiment_analyzer = None
         
         # Try NLTK sentiment analyzer first (lightweight)
         if NLTK_AVAILABLE:
             try:
-                nltk.download('vader_lexicon', quiet=True)
+                if not _NLTK_READY:
+                    nltk.download('vader_lexicon', quiet=True)
+                    _NLTK_READY = True
                 self.sentiment_analyzer = SentimentIntensityAnalyzer()
             except:
                 pass
         
+        # Then the quantized ONNX export, if one has been built
+        if ONNX_AVAILABLE and not self.sentiment_analyzer and os.path.isdir(SENTIMENT_ONNX_DIR):
+            try:
+                provider = "CUDAExecutionProvider" if self.device >= 0 else "CPUExecutionProvider"
+                self.sentiment_analyzer = pipeline(
+                    "sentiment-analysis",
+                    model=ORTModelForSequenceClassification.from_pretrained(SENTIMENT_ONNX_DIR, provider=provider),
+                    tokenizer=AutoTokenizer.from_pretrained(SENTIMENT_ONNX_DIR)
+                )
+            except:
+                pass
+        
         # Try transformers as fallback (if available)
         if TRANSFORMERS_AVAILABLE and not self.sentiment_analyzer:
             try:
+                # Half precision on GPU, full precision on CPU
                 self.sentiment_analyzer = pipeline(
                     "sentiment-analysis",
                     model="distilbert-base-uncased-finetuned-sst-2-english",
-                    device=self.device
+                    device=self.device,
+                    torch_dtype=torch.float16 if self.device >= 0 else torch.float32,
+                    model_kwargs={"low_cpu_mem_usage": True}
                 )
             except:
                 pass
@@ -58,26 +178,43 @@ class NLPEngine:
             'vehicle_part': r'\b(engine|brake|tire|battery|oil|fuel|transmission|clutch)\b',
             'location': r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b'
         }
+        self._entity_res = [
+            (entity_type, re.compile(pattern, re.IGNORECASE))
+            for entity_type, pattern in self.entity_patterns.items()
+        ]
         
         # Enhanced intent keywords
-        self.intent_keywords = {
-            'question': ['what', 'how', 'why', 'when', 'where', 'which', 'who', 'is', 'are', 'can', 'could', 'should', 'would'],
-            'request': ['please', 'help', 'show', 'tell', 'give', 'provide', 'explain'],
-            'complaint': ['problem', 'issue', 'wrong', 'bad', 'terrible', 'awful', 'broken', 'not working'],
-            'praise': ['good', 'great', 'excellent', 'amazing', 'perfect', 'love', 'like', 'awesome'],
-            'comparison': ['vs', 'versus', 'compare', 'better', 'worse', 'difference', 'between'],
-            'improvement': ['improve', 'better', 'optimize', 'enhance', 'increase', 'reduce', 'save']
-        }
+        self.intent_keywords = _INTENT_KEYWORDS
 
     def analyze_message(self, message: str) -> Dict:
-        """Comprehensive message analysis"""
+        """Comprehensive message analysis, cached per message.
+
+        The result is shared between callers and must not be modified.
+        """
+        return self._cached_analysis(message)
+
+    def analyze_batch(self, messages: List[str]) -> List[Dict]:
+        """Analyze several messages, running the sentiment model once over all of them"""
+        settled = [_rule_settled_sentiment(message, _tokens(message.lower())) for message in messages]
+        model_sentiments = iter(self._ml_sentiments(
+            [message for message, sentiment in zip(messages, settled) if sentiment is None]
+        ))
+        return [
+            self._analyze_message(message, sentiment if sentiment is not None else next(model_sentiments))
+            for message, sentiment in zip(messages, settled)
+        ]
+
+    def _analyze_message(self, message: str, ml_sentiment: Optional[Dict] = None) -> Dict:
+        # Lower-cased once and tokenized once for every step below
+        message_lower = message.lower()
+        tokens = _tokens(message_lower)
         result = {
             'original_message': message,
             'cleaned_message': self._clean_text(message),
-            'intent': self._detect_intent(message),
-            'sentiment': self._analyze_sentiment(message),
+            'intent': self._detect_intent(message, tokens, message_lower),
+            'sentiment': self._analyze_sentiment(message, tokens, ml_sentiment),
             'entities': self._extract_entities(message),
-            'keywords': self._extract_keywords(message),
+            'keywords': self._extract_keywords(message, tokens),
             'confidence': 0.0
         }
         
@@ -88,21 +225,29 @@ class NLPEngine:
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         # Remove extra whitespace and normalize
-        text = re.sub(r'\s+', ' ', text.strip())
-        # Remove special characters but keep punctuation
-        text = re.sub(r'[^\w\s.,!?-]', '', text)
-        return text
+        text = ' '.join(text.split())
+        # Remove special characters but keep punctuation; a translate table
+        # covers plain ASCII, the regex handles Unicode letters and symbols
+        if text.isascii():
+            return text.translate(_ASCII_SPECIAL_CHARS)
+        return _SPECIAL_CHARS_RE.sub('', text)
 
-    def _detect_intent(self, message: str) -> Dict:
+    def _detect_intent(self, message: str, tokens: Optional[frozenset] = None,
+                       message_lower: Optional[str] = None) -> Dict:
         """Enhanced intent detection"""
-        message_lower = message.lower()
+        if message_lower is None:
+            message_lower = message.lower()
+        if tokens is None:
+            tokens = _tokens(message_lower)
         detected_intents = {}
         
         # Rule-based intent detection
-        for intent, keywords in self.intent_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in message_lower)
+        for intent, words, phrases, keyword_count in _INTENT_CUES:
+            score = len(tokens & words)
+            if phrases:
+                score += sum(1 for phrase in phrases if phrase in message_lower)
             if score > 0:
-                detected_intents[intent] = score / len(keywords)
+                detected_intents[intent] = score / keyword_count
         
         # ML-based intent detection (if available)
         if self.intent_classifier:
@@ -125,40 +270,21 @@ class NLPEngine:
             'all_intents': detected_intents
         }
 
-    def _analyze_sentiment(self, message: str) -> Dict:
+    def _analyze_sentiment(self, message: str, tokens: Optional[frozenset] = None,
+                           ml_sentiment: Optional[Dict] = None) -> Dict:
         """Analyze message sentiment"""
         # Rule-based sentiment
-        positive_words = ['good', 'great', 'excellent', 'love', 'like', 'amazing', 'perfect', 'awesome', 'thanks']
-        negative_words = ['bad', 'terrible', 'awful', 'hate', 'problem', 'issue', 'wrong', 'broken', 'frustrated']
-        
-        message_lower = message.lower()
-        pos_score = sum(1 for word in positive_words if word in message_lower)
-        neg_score = sum(1 for word in negative_words if word in message_lower)
+        if tokens is None:
+            tokens = _tokens(message.lower())
+        pos_score = len(tokens & _POSITIVE_WORDS)
+        neg_score = len(tokens & _NEGATIVE_WORDS)
         
         rule_sentiment = 'positive' if pos_score > neg_score else 'negative' if neg_score > pos_score else 'neutral'
         rule_confidence = abs(pos_score - neg_score) / max(len(message.split()), 1)
         
-        # ML-based sentiment (if available)
-        ml_sentiment = {'label': 'neutral', 'score': 0.5}
-        if self.sentiment_analyzer:
-            try:
-                if hasattr(self.sentiment_analyzer, 'polarity_scores'):  # NLTK
-                    scores = self.sentiment_analyzer.polarity_scores(message)
-                    compound = scores['compound']
-                    if compound >= 0.05:
-                        ml_sentiment = {'label': 'positive', 'score': abs(compound)}
-                    elif compound <= -0.05:
-                        ml_sentiment = {'label': 'negative', 'score': abs(compound)}
-                    else:
-                        ml_sentiment = {'label': 'neutral', 'score': 0.5}
-                else:  # Transformers
-                    ml_result = self.sentiment_analyzer(message)[0]
-                    ml_sentiment = {
-                        'label': ml_result['label'].lower(),
-                        'score': ml_result['score']
-                    }
-            except:
-                pass
+        # ML-based sentiment (if available and needed)
+        if ml_sentiment is None:
+            ml_sentiment = _rule_settled_sentiment(message, tokens) or self._ml_sentiments([message])[0]
         
         return {
             'rule_based': {'label': rule_sentiment, 'confidence': rule_confidence},
@@ -166,32 +292,49 @@ class NLPEngine:
             'final': ml_sentiment['label'] if ml_sentiment['score'] > 0.7 else rule_sentiment
         }
 
+    def _ml_sentiments(self, messages: List[str]) -> List[Dict]:
+        """Model sentiment for each message; neutral when no model is available"""
+        neutral = {'label': 'neutral', 'score': 0.5}
+        ml_sentiments = [neutral] * len(messages)
+        if self.sentiment_analyzer:
+            try:
+                if hasattr(self.sentiment_analyzer, 'polarity_scores'):  # NLTK
+                    for i, message in enumerate(messages):
+                        compound = self.sentiment_analyzer.polarity_scores(message)['compound']
+                        if compound >= 0.05:
+                            ml_sentiments[i] = {'label': 'positive', 'score': abs(compound)}
+                        elif compound <= -0.05:
+                            ml_sentiments[i] = {'label': 'negative', 'score': abs(compound)}
+                else:  # Transformers: one pipeline call for the whole batch
+                    ml_results = self.sentiment_analyzer(list(messages), batch_size=SENTIMENT_BATCH_SIZE, truncation=True)
+                    ml_sentiments = [
+                        {'label': ml_result['label'].lower(), 'score': ml_result['score']}
+                        for ml_result in ml_results
+                    ]
+            except:
+                pass
+        return ml_sentiments
+
     def _extract_entities(self, message: str) -> Dict:
         """Extract domain-specific entities"""
         entities = {}
         
-        for entity_type, pattern in self.entity_patterns.items():
-            matches = re.findall(pattern, message, re.IGNORECASE)
+        for entity_type, pattern in self._entity_res:
+            matches = pattern.findall(message)
             if matches:
                 entities[entity_type] = matches
         
         return entities
 
-    def _extract_keywords(self, message: str) -> List[str]:
+    def _extract_keywords(self, message: str, tokens: Optional[frozenset] = None) -> List[str]:
         """Extract important keywords"""
-        # Vehicle-specific keywords
-        vehicle_keywords = [
-            'fuel', 'gas', 'efficiency', 'mileage', 'consumption', 'speed', 'rpm', 'brake',
-            'engine', 'maintenance', 'service', 'oil', 'tire', 'battery', 'transmission',
-            'safety', 'accident', 'crash', 'route', 'navigation', 'traffic', 'cost',
-            'save', 'money', 'performance', 'driving', 'trip', 'distance'
-        ]
-        
-        message_lower = message.lower()
-        found_keywords = [kw for kw in vehicle_keywords if kw in message_lower]
+        # Vehicle-specific keywords, in vocabulary order
+        if tokens is None:
+            tokens = _tokens(message.lower())
+        found_keywords = sorted(tokens & _VEHICLE_KEYWORD_SET, key=_VEHICLE_KEYWORD_RANK.__getitem__)
         
         # Add extracted numbers as potential keywords
-        numbers = re.findall(r'\b\d+(?:\.\d+)?\b', message)
+        numbers = _NUMBER_RE.findall(message)
         found_keywords.extend(numbers)
         
         return found_keywords
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def calculate_driving_score(
     avg_speed, max_rpm, brake_events, steering_angle, angular_velocity,
     acceleration, gear_position, tire_pressure, engine_load,
@@ -25,6 +28,40 @@ def calculate_driving_score(
     return behavior, round(score, 2)
 
 
+def calculate_driving_scores(trips):
+    """
+    Score many trips at once.
+
+    trips is an (N, 12) array-like whose columns follow the argument order of
+    calculate_driving_score. Returns (behaviors, scores) as NumPy arrays, with
+    the same weights, clamping and rounding as the single-trip version.
+    """
+    (avg_speed, max_rpm, brake_events, steering_angle, angular_velocity,
+     acceleration, gear_position, tire_pressure, engine_load,
+     throttle_position, brake_pressure, trip_duration) = np.asarray(trips, dtype=np.float64).T
+
+    score = (
+        (avg_speed / 100) * 0.10 +
+        ((6000 - max_rpm) / 6000) * 0.10 +
+        ((15 - brake_events) / 15) * 0.10 +
+        ((30 - np.abs(steering_angle)) / 30) * 0.05 +
+        ((5 - np.abs(angular_velocity)) / 5) * 0.05 +
+        ((5 - np.abs(acceleration)) / 5) * 0.05 +
+        ((6 - gear_position) / 6) * 0.05 +
+        ((35 - np.abs(tire_pressure - 32)) / 5) * 0.05 +
+        ((100 - engine_load) / 100) * 0.10 +
+        ((100 - throttle_position) / 100) * 0.10 +
+        ((100 - brake_pressure) / 100) * 0.05 +
+        ((60 - trip_duration) / 60) * 0.1
+    ) * 100
+
+    score = np.clip(score, 0, 100)
+    # np.round scales by 100 and rounds half to even, which can land a cent
+    # away from Python's correctly rounded round() on exact-half values
+    rounded = np.array([round(value, 2) for value in score.tolist()], dtype=np.float64)
+    return classify_behaviors(score), rounded
+
+
 def classify_behavior(score):
     if score >= 80:
         return "Safe"
@@ -32,3 +69,9 @@ def classify_behavior(score):
         return "Moderate"
     else:
         return "Aggressive"
+
+
+def classify_behaviors(scores):
+    """Vectorised classify_behavior: an array of labels for an array of scores"""
+    scores = np.asarray(scores)
+    return np.where(scores >= 80, "Safe", np.where(scores >= 60, "Moderate", "Aggressive"))
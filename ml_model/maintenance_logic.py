@@ -4,6 +4,8 @@ ml_model/maintenance_logic.py
 Health recommendations and maintenance alerts logic based on trip data.
 Compatible with the alerts table in the latest db.py schema.
 """
+from functools import lru_cache
+
 
 def build_alerts(trip):
     """
@@ -141,6 +143,7 @@ def build_alerts(trip):
 
     return alerts, health_recommendation
 
+@lru_cache(maxsize=32)
 def get_health_recommendation(behavior_class):
     """
     Get health recommendation based on ML behavior classification.
@@ -148,6 +151,8 @@ def get_health_recommendation(behavior_class):
         behavior_class (str): ML predicted behavior ('Good', 'Average', 'Risky', etc.)
     Returns:
         str: Health recommendation message.
+
+    Results are memoized per label since the mapping is static.
     """
     recommendations = {
         'Good':       "🌟 Excellent driving behavior! Vehicle health should remain optimal with regular maintenance.",
@@ -163,14 +168,15 @@ def get_health_recommendation(behavior_class):
 def save_alerts_to_db(alerts, user_id, trip_id):
     """
     Save alerts to the alerts table.
+    The INSERT is prepared once and reused for every alert via executemany().
     """
     from utils.db import get_db_connection
     conn = get_db_connection()
-    for alert in alerts:
-        conn.execute('''
-            INSERT INTO alerts (user_id, trip_id, alert_type, severity, title, message, icon)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    conn.executemany('''
+        INSERT INTO alerts (user_id, trip_id, alert_type, severity, title, message, icon)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [
+        (
             user_id,
             trip_id,
             alert["alert_type"],
@@ -178,7 +184,9 @@ def save_alerts_to_db(alerts, user_id, trip_id):
             alert["title"],
             alert["description"],
             alert["icon"]
-        ))
+        )
+        for alert in alerts
+    ])
     conn.commit()
     conn.close()
 
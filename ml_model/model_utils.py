@@ -62,6 +62,12 @@ import json
 import joblib
 import os
 import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+# Classifiers whose predict() is exactly the argmax of predict_proba(), so
+# a single pass over the trees yields both the class and its confidence
+PROBA_ARGMAX_MODELS = (RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)
 
 def load_artifacts():
     """
@@ -125,37 +131,32 @@ def predict_behavior(trip_data, model, scaler, le, model_info):
         dict: Prediction results with behavior class, confidence, etc.
     """
     try:
-        # Extract features in correct order
+        # Extract features in correct order (missing or None -> 0.0)
         features = model_info['features']
-        feature_values = []
-        
-        for feature in features:
-            if feature in trip_data:
-                value = trip_data[feature]
-                # Handle None values
-                if value is None:
-                    value = 0.0
-                feature_values.append(float(value))
-            else:
-                # Default value for missing features
-                feature_values.append(0.0)
+        feature_values = [float(trip_data.get(feature) or 0.0) for feature in features]
         
-        # Convert to numpy array
-        X = np.array(feature_values).reshape(1, -1)
+        # Tree ensembles split on float32 internally, so build the row at
+        # that precision instead of letting sklearn convert a float64 copy
+        X = np.asarray(feature_values, dtype=np.float32).reshape(1, -1)
         
         # Apply scaling if needed
         if model_info['needs_scaling']:
             X = scaler.transform(X)
         
-        # Make prediction
-        prediction = model.predict(X)[0]
-        
-        # Get prediction probabilities if available
-        try:
+        if isinstance(model, PROBA_ARGMAX_MODELS):
             prediction_proba = model.predict_proba(X)[0]
+            prediction = model.classes_[np.argmax(prediction_proba)]
             confidence = float(max(prediction_proba)) * 100
-        except:
-            confidence = 0.0
+        else:
+            # Make prediction
+            prediction = model.predict(X)[0]
+            
+            # Get prediction probabilities if available
+            try:
+                prediction_proba = model.predict_proba(X)[0]
+                confidence = float(max(prediction_proba)) * 100
+            except:
+                confidence = 0.0
         
         # Convert prediction back to label
         behavior_class = le.inverse_transform([prediction])[0]
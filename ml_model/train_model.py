@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import os
 import joblib
@@ -25,13 +26,17 @@ def fetch_data():
         logging.error("Failed to fetch data from database: %s", str(e))
         return pd.DataFrame()
 
-def label_behavior(row):
-    if row["avg_speed_kmph"] >= 80 and row["max_rpm"] < 4000:
-        return "Safe"
-    elif row["avg_speed_kmph"] >= 60:
-        return "Moderate"
-    else:
-        return "Aggressive"
+def label_behaviors(df):
+    """Behavior label for every trip, computed on whole columns rather than per row"""
+    speed = pd.to_numeric(df["avg_speed_kmph"], errors="coerce").to_numpy(dtype=float)
+    rpm = pd.to_numeric(df["max_rpm"], errors="coerce").to_numpy(dtype=float)
+    # Comparisons with NaN are False, so trips with a missing (or
+    # non-numeric) value fall through to the same label as the row rules
+    return np.select(
+        [(speed >= 80) & (rpm < 4000), speed >= 60],
+        ["Safe", "Moderate"],
+        default="Aggressive",
+    )
 
 def train_model():
     df = fetch_data()
@@ -40,7 +45,7 @@ def train_model():
         return
 
     # Add behavior labels
-    df["behavior"] = df.apply(label_behavior, axis=1)
+    df["behavior"] = label_behaviors(df)
 
     # Define feature set
     features = [
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app modules are imported from the project root, as app.py does
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,70 @@
+"""Rule-based intent detection in the chatbot and the NLP engine"""
+import pytest
+
+from chatbot.chatbot_logic import VehicleChatbot
+from chatbot.nlp_engine import NLPEngine
+
+
+@pytest.fixture(scope="module")
+def chatbot():
+    return VehicleChatbot()
+
+
+@pytest.fixture(scope="module")
+def engine():
+    # Only the rule-based scoring is under test, so skip loading the models
+    engine = NLPEngine.__new__(NLPEngine)
+    engine.intent_classifier = None
+    return engine
+
+
+# Expected intents are what the original substring checks returned
+@pytest.mark.parametrize("message, expected", [
+    ("How can I save fuel?", "question"),
+    ("analyze my trips", "statement"),
+    ("HELP ME", "request"),
+    ("Can you check my tires", "request"),
+    ("compare", "comparison"),
+    ("tips for driving better", "comparison"),
+    ("my rating vs last week", "comparison"),
+    ("could you enhance my mileage", "request"),
+    ("why is my rpm high", "question"),
+    ("xyzzy", "statement"),
+])
+def test_chatbot_intent_matches_baseline(chatbot, message, expected):
+    assert chatbot._detect_intent(message) == expected
+
+
+@pytest.mark.parametrize("message, expected", [
+    # Cues match whole words only: 'show' no longer counts as 'how',
+    # 'whatever' no longer as 'what'
+    ("please show me my stats", "request"),
+    ("whatever", "statement"),
+])
+def test_chatbot_intent_whole_words(chatbot, message, expected):
+    assert chatbot._detect_intent(message) == expected
+
+
+# (message, primary intent, confidence) as the original substring scoring gave them
+@pytest.mark.parametrize("message, primary, confidence", [
+    ("How can I save fuel?", "question", 2 / 13),
+    ("please help me", "request", 2 / 7),
+    ("my engine is not working", "complaint", 1 / 8),
+    ("great job, love it", "praise", 2 / 8),
+    ("compare my trips vs last week", "comparison", 2 / 7),
+    ("how do I improve my mileage", "improvement", 1 / 7),
+    ("Could you explain the score", "request", 1 / 7),
+    ("this is a terrible problem", "complaint", 2 / 8),
+    ("reduce fuel costs", "improvement", 1 / 7),
+    ("the brakes are broken", "complaint", 1 / 8),
+    ("xyzzy", "unknown", 0.0),
+])
+def test_engine_intent_matches_baseline(engine, message, primary, confidence):
+    intent = engine._detect_intent(message)
+    assert intent['primary'] == primary
+    assert intent['confidence'] == pytest.approx(confidence)
+
+
+def test_engine_intent_whole_words(engine):
+    # 'this' used to count as 'is' and 'show' as 'how', making it a question
+    assert engine._detect_intent("Show this")['primary'] == "request"
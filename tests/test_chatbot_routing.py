@@ -0,0 +1,88 @@
+"""Routing of chatbot messages to a pattern category or keyword handler"""
+import pytest
+
+from chatbot.chatbot_logic import _route_message
+
+
+@pytest.mark.parametrize("message, expected", [
+    # A lower-priority match must not consume text that a higher-priority
+    # category needs: 'eco driving' (fuel_efficiency) overlaps 'driving tips'
+    ("eco driving tips", ("driving_tips", None)),
+    ("Eco Driving Tips please", ("driving_tips", None)),
+    ("any eco-driving advice?", ("driving_tips", None)),
+    ("eco-driving saves fuel", ("fuel_efficiency", None)),
+    ("fuel safe driving", ("driving_tips", None)),
+])
+def test_overlapping_categories_keep_declaration_priority(message, expected):
+    assert _route_message(message, True) == expected
+    assert _route_message(message, False) == expected
+
+
+@pytest.mark.parametrize("message, has_user_data, expected", [
+    # Priority follows category declaration order, not position in the message
+    ("check my fuel", True, ("fuel_efficiency", None)),
+    ("cheap route", True, ("route", None)),
+    ("brake service cost", True, ("maintenance", None)),
+    ("hello, any safe driving tips?", True, ("greeting", None)),
+    # trip_data only counts when there are trips to analyse
+    ("road trip weather", True, ("trip_data", None)),
+    ("road trip weather", False, ("weather", None)),
+])
+def test_category_priority_is_declaration_order(message, has_user_data, expected):
+    assert _route_message(message, has_user_data) == expected
+
+
+# Expected routes are what the original per-category re.search loop and
+# substring keyword checks returned: (with trips, without trips)
+BASELINE_ROUTES = [
+    ("How can I save fuel?", ("fuel_efficiency", None), ("fuel_efficiency", None)),
+    ("analyze my trips", ("trip_data", None), (None, None)),
+    ("what is my score", (None, "performance"), (None, "performance")),
+    ("rpm advice", ("trip_data", None), (None, "rpm")),
+    ("I drove at 90 km/h", (None, None), (None, None)),
+    ("weekly summary", (None, "summary"), (None, "summary")),
+    ("compare", (None, "compare"), (None, "compare")),
+    ("my car", (None, "vehicle"), (None, "vehicle")),
+    ("weather", ("weather", None), ("weather", None)),
+    ("xyzzy", (None, None), (None, None)),
+    ("how do I improve", (None, "improvement"), (None, "improvement")),
+    ("HELP ME", (None, "help"), (None, "help")),
+    ("What can you do", (None, "help"), (None, "help")),
+    ("cost of driving", ("cost", None), ("cost", None)),
+    ("route planning", ("route", None), ("route", None)),
+    ("safety tips", ("safety", None), ("safety", None)),
+    ("Maintenance schedule", ("maintenance", None), ("maintenance", None)),
+    ("acceleration", (None, "acceleration"), (None, "acceleration")),
+    ("Any alerts today?", (None, "alert"), (None, "alert")),
+    ("Performance", ("trip_data", None), (None, "performance")),
+    ("GOOD MORNING", ("greeting", None), ("greeting", None)),
+    ("revolutions", (None, "rpm"), (None, "rpm")),
+    ("tips for driving better", (None, None), (None, None)),
+    ("my rating vs last week", (None, "performance"), (None, "performance")),
+    ("thanks for the help", (None, "thanks"), (None, "thanks")),
+    ("Can you check my tires", ("maintenance", None), ("maintenance", None)),
+    ("how to drive in snow", ("driving_tips", None), ("driving_tips", None)),
+    ("I want to drive better", ("driving_tips", None), ("driving_tips", None)),
+    ("consistent progress", (None, "streak"), (None, "streak")),
+    ("trip vs trip", ("trip_data", None), (None, "compare")),
+    ("Which road is cheaper?", ("route", None), ("route", None)),
+    ("why is my rpm high", ("trip_data", None), (None, "rpm")),
+]
+
+
+@pytest.mark.parametrize("message, with_trips, without_trips", BASELINE_ROUTES)
+def test_routes_match_baseline(message, with_trips, without_trips):
+    assert _route_message(message, True) == with_trips
+    assert _route_message(message, False) == without_trips
+
+
+@pytest.mark.parametrize("message, expected", [
+    # 'how' plus 'improve'/'better' is checked on whole words, so words that
+    # merely contain them ('showed', 'however', 'betterment') do not count
+    ("how better", (None, "improvement")),
+    ("it showed improvement", (None, None)),
+    ("however, better", (None, None)),
+    ("how about betterment", (None, None)),
+])
+def test_improvement_needs_whole_words(message, expected):
+    assert _route_message(message, False) == expected
@@ -0,0 +1,60 @@
+"""Trip statistics in chatbot replies"""
+import pytest
+
+from chatbot.chatbot_logic import VehicleChatbot, _trip_rows, _trip_stats
+
+TRIPS = [
+    {'distance_km': 12.5, 'avg_speed_kmph': 85, 'max_rpm': 3200, 'fuel_consumed': 1.1, 'brake_events': 12},
+    {'distance_km': 40, 'avg_speed_kmph': 95.5, 'max_rpm': 3900, 'fuel_consumed': 3.4, 'brake_events': 9},
+    {'distance_km': 7.25, 'avg_speed_kmph': 30, 'max_rpm': 2100, 'fuel_consumed': 0.6, 'brake_events': 2},
+]
+
+
+def test_trip_stats_match_per_trip_sums():
+    stats = _trip_stats(_trip_rows(TRIPS))
+    assert stats.count == 3
+    assert stats.total_distance == pytest.approx(sum(t['distance_km'] for t in TRIPS))
+    assert stats.total_fuel == pytest.approx(sum(t['fuel_consumed'] for t in TRIPS))
+    assert stats.total_brake_events == 23
+    assert stats.avg_speed == pytest.approx(sum(t['avg_speed_kmph'] for t in TRIPS) / 3)
+    assert stats.avg_rpm == pytest.approx(sum(t['max_rpm'] for t in TRIPS) / 3)
+
+
+def test_trip_stats_missing_fields_count_as_zero():
+    stats = _trip_stats(_trip_rows([{'distance_km': 10}, {'avg_speed_kmph': 40, 'brake_events': 3}]))
+    assert stats.total_distance == 10
+    assert stats.total_fuel == 0
+    assert stats.total_brake_events == 3
+    assert stats.avg_speed == 20
+
+
+def test_trip_analysis_matches_baseline():
+    # Text the original per-trip sums produced for TRIPS
+    assert VehicleChatbot()._analyze_trip_data({'recent_trips': TRIPS}) == (
+        "📈 Analysis of your recent 3 trips:\n\n"
+        "🛣️ Total distance: 59.8 km\n"
+        "⚡ Average speed: 70.2 km/h\n"
+        "⛽ Average fuel consumption: 1.7 L\n"
+        "🔧 Average max RPM: 3067\n"
+        "🛑 Total brake events: 23\n\n"
+        "💡 Recommendations:\n"
+        "• Try to keep RPM under 3000 for better engine efficiency\n"
+        "• Great job on smooth driving with minimal braking!\n"
+    )
+
+
+def test_vehicle_info_without_fuel_recorded():
+    user_data = {'vehicle_number': 'X1', 'recent_trips': [{'distance_km': 10, 'speed_kmph': 50}]}
+    reply = VehicleChatbot()._vehicle_info(user_data)
+    assert "Total distance: 10.0 km" in reply
+    assert "Fuel efficiency: 0.0 km/L" in reply
+
+
+def test_vehicle_info_fuel_efficiency():
+    user_data = {'vehicle_number': 'X1', 'recent_trips': [
+        {'distance_km': 30, 'fuel_consumed': 2.0},
+        {'distance_km': 10, 'fuel_consumed': 2.0},
+    ]}
+    reply = VehicleChatbot()._vehicle_info(user_data)
+    assert "Average fuel consumption: 2.0 L per trip" in reply
+    assert "Fuel efficiency: 10.0 km/L" in reply
@@ -0,0 +1,71 @@
+"""Rule-based driving score and behavior classification"""
+import numpy as np
+import pytest
+
+from ml_model.driving_logic import (
+    calculate_driving_score, calculate_driving_scores, classify_behavior, classify_behaviors
+)
+
+
+def reference_score(avg_speed, max_rpm, brake_events, steering_angle, angular_velocity,
+                    acceleration, gear_position, tire_pressure, engine_load,
+                    throttle_position, brake_pressure, trip_duration):
+    """The score formula as originally written, one normalised term per feature"""
+    score = (
+        (avg_speed / 100) * 0.10 +
+        ((6000 - max_rpm) / 6000) * 0.10 +
+        ((15 - brake_events) / 15) * 0.10 +
+        ((30 - abs(steering_angle)) / 30) * 0.05 +
+        ((5 - abs(angular_velocity)) / 5) * 0.05 +
+        ((5 - abs(acceleration)) / 5) * 0.05 +
+        ((6 - gear_position) / 6) * 0.05 +
+        ((35 - abs(tire_pressure - 32)) / 5) * 0.05 +
+        ((100 - engine_load) / 100) * 0.10 +
+        ((100 - throttle_position) / 100) * 0.10 +
+        ((100 - brake_pressure) / 100) * 0.05 +
+        ((60 - trip_duration) / 60) * 0.1
+    ) * 100
+    return max(0, min(score, 100))
+
+
+def random_trips(n, seed=0):
+    rng = np.random.default_rng(seed)
+    low = [0, 800, 0, -45, -8, -8, 1, 25, 0, 0, 0, 1]
+    high = [140, 7000, 25, 45, 8, 8, 6, 40, 100, 100, 100, 120]
+    return rng.uniform(low, high, size=(n, 12))
+
+
+def test_scores_match_original_formula_exactly():
+    for trip in random_trips(5000).tolist():
+        expected = reference_score(*trip)
+        assert calculate_driving_score(*trip) == (classify_behavior(expected), round(expected, 2))
+
+
+@pytest.mark.parametrize("trip", [
+    [60, 2500, 3, 10, 1, 1, 3, 32, 40, 30, 20, 25],
+    [120, 5500, 20, 40, 6, 6, 6, 26, 90, 90, 80, 110],
+    [0, 0, 0, 0, 0, 0, 0, 32, 0, 0, 0, 0],
+    [1] * 12,
+])
+def test_known_trips_match_original_formula(trip):
+    expected = reference_score(*trip)
+    assert calculate_driving_score(*trip) == (classify_behavior(expected), round(expected, 2))
+
+
+def test_vectorised_scores_match_scalar_exactly():
+    trips = np.vstack([random_trips(2000, seed=1), np.round(random_trips(2000, seed=2))])
+    behaviors, scores = calculate_driving_scores(trips)
+    expected = [calculate_driving_score(*trip) for trip in trips.tolist()]
+    assert behaviors.tolist() == [behavior for behavior, _ in expected]
+    assert scores.tolist() == [score for _, score in expected]
+
+
+def test_vectorised_scores_empty():
+    behaviors, scores = calculate_driving_scores(np.empty((0, 12)))
+    assert behaviors.shape == (0,)
+    assert scores.shape == (0,)
+
+
+def test_classify_behaviors_matches_scalar():
+    scores = np.array([0, 59.99, 60, 79.99, 80, 100])
+    assert classify_behaviors(scores).tolist() == [classify_behavior(s) for s in scores]
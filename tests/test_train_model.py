@@ -0,0 +1,37 @@
+"""Behavior labels used as the training target"""
+import numpy as np
+import pandas as pd
+
+from ml_model.train_model import label_behaviors
+
+
+def label_behavior(row):
+    """The original row-wise labelling rule"""
+    if row["avg_speed_kmph"] >= 80 and row["max_rpm"] < 4000:
+        return "Safe"
+    elif row["avg_speed_kmph"] >= 60:
+        return "Moderate"
+    else:
+        return "Aggressive"
+
+
+def test_label_behaviors_matches_row_rule():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "avg_speed_kmph": rng.integers(30, 120, 2000).astype(float),
+        "max_rpm": rng.integers(1500, 6000, 2000).astype(float),
+    })
+    # Thresholds themselves and missing values
+    df.loc[:3, "avg_speed_kmph"] = [80, 60, 79.999, np.nan]
+    df.loc[:3, "max_rpm"] = [4000, 3999, np.nan, 2000]
+    expected = df.apply(label_behavior, axis=1).tolist()
+    assert label_behaviors(df).tolist() == expected
+
+
+def test_label_behaviors_non_numeric_values():
+    # Stored blobs or text in a numeric column count as missing
+    df = pd.DataFrame({
+        "avg_speed_kmph": [90, 90, "fast", None],
+        "max_rpm": [3000, b"\x82\x00", 3000, 3000],
+    }, dtype=object)
+    assert label_behaviors(df).tolist() == ["Safe", "Moderate", "Aggressive", "Aggressive"]
@@ -5,9 +5,20 @@ import os
 os.makedirs("instance", exist_ok=True)
 DB_PATH = os.path.join("instance", "trips.db")
 
+class Row(sqlite3.Row):
+    """
+    sqlite3.Row with a dict-style get(), so rows can be handed to helpers
+    that expect trip dicts without copying them into one first.
+    """
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except IndexError:
+            return default
+
 def get_db_connection():
     conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn.row_factory = Row
     return conn
 
 def init_db():